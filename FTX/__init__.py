@@ -1,3 +1,46 @@
 """
 An unofficial Python wrapper for the FTX exchange API
 """
+import importlib
+
+# public names and the submodule defining them; the submodule is imported on
+# first access, so that `import FTX` costs nothing and a script signing one
+# request loads neither requests nor asyncio
+_EXPORTS = {
+    "Client": "client",
+    "AsyncClient": "async_client",
+    "WebsocketClient": "websocket",
+    "SubaccountPool": "pool",
+    "HistoryStore": "history",
+    "CandleStore": "candlestore",
+    "FTXError": "exceptions",
+    "Invalid": "exceptions",
+    "DoesntExist": "exceptions",
+    "RateLimitExceeded": "exceptions",
+    "ServerError": "exceptions",
+    "NetworkError": "exceptions",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        # submodules, e.g. FTX.constants after a bare `import FTX`
+        try:
+            return importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}"
+            ) from None
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # cache it, so that __getattr__ is not called again for it
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
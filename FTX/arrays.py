@@ -0,0 +1,95 @@
+"""
+Decoding of candles, trades and order books into NumPy arrays.
+Requires the optional `numpy` package.
+"""
+from . import constants
+from . import helpers
+
+CANDLE_FIELDS = constants.CANDLE_FIELDS
+
+TRADE_FIELDS = ("id", "time", "price", "size", "side", "liquidation")
+
+
+def _numpy():
+    import numpy
+
+    return numpy
+
+
+def candle_dtype():
+    # laid out like a CandleStore record, so views over store files share it
+    return _numpy().dtype([(field, "<f8") for field in CANDLE_FIELDS])
+
+
+def trade_dtype():
+    return _numpy().dtype(
+        [
+            ("id", "<i8"),
+            ("time", "<f8"),
+            ("price", "<f8"),
+            ("size", "<f8"),
+            # 1 for buy, -1 for sell
+            ("side", "i1"),
+            ("liquidation", "?"),
+        ]
+    )
+
+
+def candles(records: list):
+    """
+    :param records: candles as returned by `Client.get_k_line`
+    :return: a structured array with the `CANDLE_FIELDS` columns,
+      `time` being the start of the candle in seconds
+    """
+    nan = float("nan")
+    return _numpy().fromiter(
+        (
+            (
+                record["time"] / 1_000,
+                record["open"],
+                record["high"],
+                record["low"],
+                record["close"],
+                nan if record.get("volume") is None else record["volume"],
+            )
+            for record in records
+        ),
+        dtype=candle_dtype(),
+        count=len(records),
+    )
+
+
+def trades(records: list):
+    """
+    :param records: trades as returned by `Client.get_recent_trades`
+    :return: a structured array with the `TRADE_FIELDS` columns,
+      `time` being in seconds
+    """
+    return _numpy().fromiter(
+        (
+            (
+                record["id"],
+                helpers.parse_time(record["time"]),
+                record["price"],
+                record["size"],
+                1 if record["side"] == "buy" else -1,
+                record["liquidation"],
+            )
+            for record in records
+        ),
+        dtype=trade_dtype(),
+        count=len(records),
+    )
+
+
+def orderbook(book: dict) -> dict:
+    """
+    :param book: an order book as returned by `Client.get_orderbook`
+    :return: a dict contains the bids and asks as (levels, 2) float arrays
+      of price and size, best level first
+    """
+    numpy = _numpy()
+    return {
+        side: numpy.array(book[side], dtype=float).reshape(-1, 2)
+        for side in ("bids", "asks")
+    }
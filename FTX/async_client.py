@@ -0,0 +1,181 @@
+"""
+An asyncio flavour of the FTX client
+"""
+import asyncio
+import functools
+from typing import Optional
+
+from . import batch
+from . import pagination
+from .cache import MetadataCache
+from .client import Client
+from .coalesce import SingleFlight
+from .codec import Codec
+from .exceptions import NetworkError
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .retry import Hedge, RetryPolicy
+from .snapshot import Snapshot
+from .transport import AiohttpTransport, AsyncTransport
+
+
+class AsyncClient(Client):
+    """
+    Coroutine version of `Client`: every public method of `Client` is
+    available with the same signature and has to be awaited.
+
+        async with AsyncClient(key, secret) as client:
+            book, fills = await asyncio.gather(
+                client.get_orderbook("BTC-PERP"), client.get_fills("BTC-PERP")
+            )
+
+    The `iter_*` methods return async iterators to use with `async for`.
+    Requests are signed and built exactly like `Client` does and share one
+    connection pool, so many of them can be in flight on a single event loop.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        secret: str,
+        subaccount: Optional[str] = None,
+        timeout: int = 30,
+        transport: Optional[AsyncTransport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        codec: Optional[Codec] = None,
+        models: bool = False,
+        metrics: Optional[Metrics] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge: Optional[Hedge] = None,
+    ):
+        """
+        :param transport: the asyncio HTTP transport,
+          defaults to an `AiohttpTransport` owned by this client
+        """
+        super().__init__(
+            key,
+            secret,
+            subaccount,
+            timeout,
+            transport=transport if transport is not None else AiohttpTransport(),
+            rate_limiter=rate_limiter,
+            metadata_cache=metadata_cache,
+            single_flight=single_flight,
+            codec=codec,
+            models=models,
+            metrics=metrics,
+            retry_policy=retry_policy,
+            hedge=hedge,
+        )
+
+    async def close(self):
+        await self._transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # `with` could not await close, and the session would be left open
+    def __enter__(self):
+        raise TypeError("AsyncClient is closed asynchronously, use `async with`")
+
+    def __exit__(self, *exc_info):
+        raise TypeError("AsyncClient is closed asynchronously, use `async with`")
+
+    # not a request, so kept synchronous
+    invalidate_metadata = Client.invalidate_metadata
+
+    async def _send_request(
+        self, method: str, endpoint: str, query: Optional[dict] = None, raw=False
+    ):
+        if method == "GET" and self._single_flight is not None:
+            return await self._single_flight.do_async(
+                self._flight_key(endpoint, query) + (raw,),
+                lambda: self._request(method, endpoint, query, raw),
+                self._scope(endpoint) == "public",
+            )
+        return await self._request(method, endpoint, query, raw)
+
+    async def _request(
+        self, method: str, endpoint: str, query: Optional[dict] = None, raw=False
+    ):
+        call = functools.partial(self._attempt, method, endpoint, query, raw)
+        if self._hedge is not None and self._hedge.applies(method, endpoint):
+            call = functools.partial(self._hedge.run_async, endpoint, call)
+        if self._retry_policy is not None:
+            return await self._retry_policy.run_async(method, endpoint, call)
+        return await call()
+
+    async def _attempt(
+        self, method: str, endpoint: str, query: Optional[dict] = None, raw=False
+    ):
+        with self._measure(method, endpoint) as sample:
+            weight = self._rate_limiter.weight(endpoint)
+            await self._rate_limiter.acquire_async(weight)
+            query = query or {}
+            sample.wait = sample.lap()
+
+            url, headers, body = self._prepare_request(method, endpoint, query)
+            sample.sign = sample.lap()
+
+            try:
+                response = await self._transport.request(
+                    method, url, headers, body, self._api_timeout
+                )
+            except Exception as e:
+                raise NetworkError(f"{method} {endpoint}: {e!r}") from e
+            sample.network = sample.lap()
+            sample.status, sample.size = response.status, len(response.content)
+
+            return self._decode(response, raw, sample)
+
+    def _paginate(self, fetch, cursor):
+        return pagination.aiterate(fetch, cursor)
+
+    async def _then(self, result, callback):
+        return callback(await result)
+
+    async def _resolved(self, value):
+        return value
+
+    def _batch(self, calls, max_workers):
+        return batch.run_async(calls, max_workers)
+
+    async def _snapshot(self, fetch, index, interval):
+        snapshot = await Snapshot(fetch, index).refresh_async()
+        if interval:
+            snapshot.task = asyncio.ensure_future(snapshot.run_async(interval))
+        return snapshot
+
+    def _refresh_metadata(self, endpoint: str):
+        async def refresh():
+            try:
+                self._metadata_cache.store(endpoint, await self._GET(endpoint))
+            except Exception:
+                self._metadata_cache.refresh_failed(endpoint)
+
+        asyncio.ensure_future(refresh())
+
+
+def _coroutine(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+# Client's endpoint methods hand back whatever _send_request returns, which is a
+# coroutine here; wrap them so they are proper coroutine functions. The iter_*
+# methods already return async iterators through _paginate.
+for _name, _method in vars(Client).items():
+    if (
+        not _name.startswith(("_", "iter_"))
+        and callable(_method)
+        and _name not in vars(AsyncClient)
+    ):
+        setattr(AsyncClient, _name, _coroutine(_method))
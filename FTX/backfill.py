@@ -0,0 +1,125 @@
+"""
+Concurrent download of long candle histories
+"""
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from . import constants
+from . import helpers
+from .exceptions import Invalid
+
+
+class Series(NamedTuple):
+    # the candles ordered by time, without duplicates
+    candles: List[dict]
+    # the (first, last) start times in seconds of runs of missing candles
+    gaps: List[Tuple[int, int]]
+    # the (start_time, end_time) chunks which still failed after all retries
+    failed: List[Tuple[int, int]]
+
+
+class Backfill:
+    """
+    Download candles for one or more markets by splitting the range into
+    chunks of at most `constants.MAX_K_LINE_LIMIT` candles, fetched
+    concurrently by a bounded pool of threads. Requests go through the
+    client, so they stay within its rate limiter.
+
+        series = Backfill(client, resolution=15).run(["BTC-PERP"], start, end)
+
+    :param client: the `Client` to fetch with
+    :param resolution: the time period of K line in seconds
+    :param max_workers: the number of chunks fetched at once
+    :param retries: the extra attempts for a failing chunk
+    :param backoff: the seconds to wait before the first retry, doubled after each
+    :param index: fetch `get_index_k_line` for indexes instead of markets
+    """
+
+    def __init__(
+        self,
+        client,
+        resolution: int = constants.DEFAULT_K_LINE_RESOLUTION,
+        max_workers: int = constants.DEFAULT_BACKFILL_WORKERS,
+        retries: int = constants.DEFAULT_BACKFILL_RETRIES,
+        backoff: float = 1.0,
+        index: bool = False,
+    ):
+        if resolution not in constants.VALID_K_LINE_RESOLUTIONS:
+            raise Invalid(
+                f"resolution must be in {constants.VALID_K_LINE_RESOLUTIONS}"
+            )
+
+        self._client = client
+        self._resolution = resolution
+        self._max_workers = max_workers
+        self._retries = retries
+        self._backoff = backoff
+        self._fetch = client.get_index_k_line if index else client.get_k_line
+
+    def chunks(self, start_time: int, end_time: int) -> List[Tuple[int, int]]:
+        """
+        :return: the resolution-aligned (start_time, end_time) windows covering
+          the range, each holding at most `constants.MAX_K_LINE_LIMIT` candles
+        """
+        step = self._resolution * constants.MAX_K_LINE_LIMIT
+        start = start_time - start_time % self._resolution
+        return [
+            (chunk, min(chunk + step - self._resolution, end_time))
+            for chunk in range(start, end_time + 1, step)
+        ]
+
+    def _fetch_chunk(self, market: str, chunk: Tuple[int, int]) -> list:
+        for attempt in range(self._retries + 1):
+            try:
+                return self._fetch(
+                    market, self._resolution, constants.MAX_K_LINE_LIMIT, *chunk
+                )
+            except Exception:
+                if attempt == self._retries:
+                    raise
+                sleep(self._backoff * 2 ** attempt)
+
+    def run(
+        self, markets: Iterable[str], start_time: int, end_time: int
+    ) -> Dict[str, Series]:
+        """
+        :param markets: the trading pairs (or indexes) to download
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :return: a dict contains the merged series of every market
+        """
+        markets = list(markets)
+        chunks = self.chunks(start_time, end_time)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = {
+                (market, chunk): executor.submit(self._fetch_chunk, market, chunk)
+                for market in markets
+                for chunk in chunks
+            }
+
+            series = {}
+            for market in markets:
+                candles, failed = {}, []
+                for chunk in chunks:
+                    try:
+                        page = futures[market, chunk].result()
+                    except Exception:
+                        failed.append(chunk)
+                        continue
+                    for candle in page:
+                        candles[int(helpers.parse_time(candle["time"]))] = candle
+
+                times = sorted(candles)
+                series[market] = Series(
+                    [candles[time] for time in times], self._gaps(times), failed
+                )
+        return series
+
+    def _gaps(self, times: List[int]) -> List[Tuple[int, int]]:
+        return [
+            (previous + self._resolution, current - self._resolution)
+            for previous, current in zip(times, times[1:])
+            if current - previous > self._resolution
+        ]
@@ -0,0 +1,61 @@
+"""
+Concurrent dispatch of batches of requests
+"""
+from time import perf_counter
+from typing import Awaitable, Callable, List, NamedTuple, Sequence
+
+
+class BatchResult(NamedTuple):
+    # the result of every request, or the exception it raised, in request order
+    results: list
+    # the wall-clock seconds the whole batch took
+    elapsed: float
+
+    @property
+    def errors(self) -> List[Exception]:
+        return [result for result in self.results if isinstance(result, Exception)]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _capture(call: Callable):
+    try:
+        return call()
+    except Exception as e:
+        return e
+
+
+def run(calls: Sequence[Callable], max_workers: int) -> BatchResult:
+    """
+    Run `calls` on up to `max_workers` threads, starting them in order so that
+    the first ones also take the first rate-limit tokens.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls)))) as executor:
+        results = list(executor.map(_capture, calls))
+    return BatchResult(results, perf_counter() - start)
+
+
+async def run_async(
+    calls: Sequence[Callable[[], Awaitable]], max_workers: int
+) -> BatchResult:
+    """
+    Coroutine version of `run`, with at most `max_workers` calls awaited at once.
+    """
+    import asyncio
+
+    start = perf_counter()
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def limited(call):
+        async with semaphore:
+            return await call()
+
+    results = await asyncio.gather(
+        *(limited(call) for call in calls), return_exceptions=True
+    )
+    return BatchResult(list(results), perf_counter() - start)
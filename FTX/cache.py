@@ -0,0 +1,102 @@
+"""
+TTL cache for the metadata endpoints: markets, futures and wallet coins
+"""
+import threading
+from time import monotonic
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from . import constants
+from .exceptions import DoesntExist
+
+MISSING = object()
+
+
+class _Entry(NamedTuple):
+    value: Any
+    index: Dict[str, dict]
+    refresh_at: float
+    expires_at: float
+
+
+class MetadataCache:
+    """
+    Keeps the result of each metadata endpoint for its TTL, together with an
+    index of the items by name, and asks for a background refresh once
+    `refresh_ahead` of the TTL has passed so that readers rarely wait.
+
+        client = Client(key, secret, metadata_cache=MetadataCache({"markets": 30}))
+        client.get_market("BTC-PERP")  # served from the cached market list
+
+    Cached results are shared between callers and must not be mutated.
+
+    :param ttls: seconds each endpoint stays cached, overriding
+      `constants.METADATA_TTLS`
+    :param refresh_ahead: the fraction of the TTL after which to refresh
+    """
+
+    def __init__(
+        self, ttls: Optional[Dict[str, float]] = None, refresh_ahead: float = .75
+    ):
+        self.ttls = {**constants.METADATA_TTLS, **(ttls or {})}
+        self._refresh_ahead = refresh_ahead
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._refreshing = set()
+
+    def peek(self, endpoint: str) -> Tuple[Any, bool]:
+        """
+        :param endpoint: the metadata endpoint
+        :return: the cached result or MISSING, and whether the caller
+          should start a refresh
+        """
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(endpoint)
+            if entry is None or now >= entry.expires_at:
+                return MISSING, False
+            if now >= entry.refresh_at and endpoint not in self._refreshing:
+                self._refreshing.add(endpoint)
+                return entry.value, True
+            return entry.value, False
+
+    def store(self, endpoint: str, value):
+        """
+        :return: `value`, for chaining
+        """
+        key = constants.METADATA_KEYS.get(endpoint)
+        index = {item[key]: item for item in value} if key else {}
+        ttl = self.ttls[endpoint]
+        now = monotonic()
+
+        with self._lock:
+            self._entries[endpoint] = _Entry(
+                value, index, now + ttl * self._refresh_ahead, now + ttl
+            )
+            self._refreshing.discard(endpoint)
+        return value
+
+    def refresh_failed(self, endpoint: str):
+        with self._lock:
+            self._refreshing.discard(endpoint)
+
+    def find(self, endpoint: str, name: str) -> dict:
+        """
+        :param endpoint: the metadata endpoint
+        :param name: the market, future or coin
+        :return: the item of the cached result
+        """
+        entry = self._entries.get(endpoint)
+        if entry is None or name not in entry.index:
+            kind = endpoint.rsplit("/", 1)[-1].rstrip("s")
+            raise DoesntExist(f"No such {kind}: {name}")
+        return entry.index[name]
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """
+        :param endpoint: the endpoint to forget, None for all of them
+        """
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(endpoint, None)
@@ -0,0 +1,189 @@
+"""
+On-disk candle cache with incremental sync
+"""
+import bisect
+import mmap
+import os
+import struct
+from typing import Iterable, Optional
+from urllib.parse import quote
+
+from . import constants
+from . import helpers
+from .exceptions import Invalid
+
+
+FIELDS = constants.CANDLE_FIELDS
+# one candle: the start time in seconds followed by the OHLCV values
+RECORD = struct.Struct(f"<{len(FIELDS)}d")
+
+
+class CandleView:
+    """
+    Read-only, zero-copy view over consecutive candles of a store file.
+
+        >>> view = store.read("BTC-PERP", 60, start_time, end_time)
+        >>> view[0]
+        (1609459200.0, 28923.0, 28950.0, 28900.0, 28941.0, 1234567.8)
+        >>> closes = view.column("close")  # a strided memoryview, no copy
+        >>> numpy.frombuffer(view.buffer).reshape(-1, 6)  # same memory
+
+    :param buffer: a flat memoryview of doubles, `len(FIELDS)` per candle
+    """
+
+    def __init__(self, buffer: memoryview):
+        self.buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self.buffer) // len(FIELDS)
+
+    def __getitem__(self, index: int) -> tuple:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("candle index out of range")
+        start = index * len(FIELDS)
+        return tuple(self.buffer[start:start + len(FIELDS)])
+
+    def column(self, field: str) -> memoryview:
+        """
+        :param field: one of `FIELDS`
+        :return: the values of the field for every candle
+        """
+        return self.buffer[FIELDS.index(field)::len(FIELDS)]
+
+
+class CandleStore:
+    """
+    Candles of every (market, resolution) kept in their own file of fixed-width
+    little-endian records, appended in time order. Files are memory-mapped on
+    read, so opening them costs no parsing and ranges are found by binary search.
+
+        store = CandleStore("~/.ftx/candles")
+        store.sync(client, "BTC-PERP", 60, start_time=1609459200)
+        view = store.read("BTC-PERP", 60, 1612137600, 1612224000)
+
+    A store file must have a single writer; readers may map it at any time
+    since writes only ever rewrite the last candle or append.
+
+    :param directory: the directory holding the files, created if missing
+    """
+
+    def __init__(self, directory: str):
+        self._directory = os.path.expanduser(directory)
+        os.makedirs(self._directory, exist_ok=True)
+
+    def path(self, market: str, resolution: int) -> str:
+        return os.path.join(
+            self._directory, f"{quote(market, safe='')}-{resolution}.candles"
+        )
+
+    def _map(self, market: str, resolution: int) -> Optional[memoryview]:
+        try:
+            with open(self.path(market, resolution), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                size -= size % RECORD.size
+                if not size:
+                    return None
+                # the map keeps its own handle and lives as long as the view
+                return memoryview(
+                    mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+                ).cast("d")
+        except FileNotFoundError:
+            return None
+
+    def read(
+        self,
+        market: str,
+        resolution: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> CandleView:
+        """
+        :param market: the trading pair
+        :param resolution: the time period of K line in seconds
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :return: the stored candles within the period, without any request
+        """
+        buffer = self._map(market, resolution)
+        if buffer is None:
+            return CandleView(memoryview(b"").cast("d"))
+
+        times = CandleView(buffer).column("time")
+        first = 0 if start_time is None else bisect.bisect_left(times, start_time)
+        last = len(times) if end_time is None else bisect.bisect_right(times, end_time)
+        return CandleView(buffer[first * len(FIELDS):last * len(FIELDS)])
+
+    def last_time(self, market: str, resolution: int) -> Optional[float]:
+        """
+        :return: the start time of the newest stored candle, None when empty
+        """
+        buffer = self._map(market, resolution)
+        return None if buffer is None else buffer[-len(FIELDS)]
+
+    def write(self, market: str, resolution: int, candles: Iterable[dict]) -> int:
+        """
+        Store candles as returned by `Client.get_k_line`, oldest first.
+        Candles older than the newest stored one are ignored and one starting at
+        the same time replaces it, since it may have been fetched before closing.
+
+        :return: the number of candles written
+        """
+        last = self.last_time(market, resolution)
+        written = 0
+
+        path = self.path(market, resolution)
+        with open(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b") as f:
+            # drop a record left incomplete by an interrupted write
+            size = f.seek(0, os.SEEK_END)
+            f.truncate(size - size % RECORD.size)
+            f.seek(0, os.SEEK_END)
+            for candle in candles:
+                time = helpers.parse_time(candle["time"])
+                if last is not None and time < last:
+                    continue
+                if time == last:
+                    f.seek(-RECORD.size, os.SEEK_CUR)
+                record = RECORD.pack(
+                    time,
+                    *(
+                        float("nan") if candle.get(field) is None else candle[field]
+                        for field in FIELDS[1:]
+                    ),
+                )
+                f.write(record)
+                last = time
+                written += 1
+        return written
+
+    def sync(
+        self,
+        client,
+        market: str,
+        resolution: int,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> int:
+        """
+        Fetch the candles after the newest stored one, or from `start_time`
+        when the store is empty, and append them.
+
+        :param client: the `Client` to fetch with
+        :param market: the trading pair
+        :param resolution: the time period of K line in seconds
+        :param start_time: where to start an empty store, an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :return: the number of candles written
+        """
+        last = self.last_time(market, resolution)
+        if last is None:
+            if start_time is None:
+                raise Invalid(f"no {market} candles stored, supply `start_time`")
+            last = start_time
+
+        return self.write(
+            market,
+            resolution,
+            client.iter_k_line(market, int(last), end_time, resolution),
+        )
@@ -1,17 +1,32 @@
-import datetime as dt
-import hashlib
-import hmac
-import json
-from time import sleep
-from typing import List, NewType, Optional, Dict, Union
+import functools
+import threading
+from time import time
+from typing import Iterator, List, NewType, Optional, Dict, Union
 import urllib
 from urllib.parse import urlencode
 
-from expiringdict import ExpiringDict
-import requests
-
+from . import arrays
+from . import batch
 from . import constants
 from . import helpers
+from . import models
+from . import pagination
+from .batch import BatchResult
+from .cache import MISSING, MetadataCache
+from .coalesce import SingleFlight
+from .codec import Codec, get_codec
+from .exceptions import (
+    DoesntExist,
+    Invalid,
+    NetworkError,
+    RateLimitExceeded,
+    ServerError,
+)
+from .metrics import NO_SAMPLE, Metrics
+from .ratelimit import RateLimiter
+from .retry import Hedge, RetryPolicy
+from .snapshot import PortfolioSnapshot, Snapshot
+from .transport import Response, SessionTransport, Transport
 
 
 ListOfDicts = NewType("ListOfDicts", List[dict])
@@ -23,120 +38,304 @@ ListOfDicts = NewType("ListOfDicts", List[dict])
 #   }
 BidsAndAsks = NewType("BidsAndAsks", Dict[str, List[List[float]]])
 
-
-class Invalid(Exception):
-    pass
-
-
-class DoesntExist(Exception):
-    pass
+_PRIVATE_SEGMENTS = frozenset(constants.PRIVATE_ENDPOINTS)
 
 
 class Client:
-    _requests = ExpiringDict(
-        max_len=constants.RATE_LIMIT_PER_SECOND, max_age_seconds=60
-    )
+    # shared by every client that is not given its own limiter
+    _rate_limiter = RateLimiter()
 
     def __init__(
-        self, key: str, secret: str, subaccount: Optional[str] = None, timeout: int = 30
+        self,
+        key: str,
+        secret: str,
+        subaccount: Optional[str] = None,
+        timeout: int = 30,
+        transport: Optional[Transport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        codec: Optional[Codec] = None,
+        models: bool = False,
+        metrics: Optional[Metrics] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge: Optional[Hedge] = None,
     ):
+        """
+        :param key: the API key
+        :param secret: the API secret
+        :param subaccount: the subaccount to act on, None for the main account
+        :param timeout: the request timeout in seconds
+        :param transport: the HTTP transport, defaults to a keep-alive
+          `SessionTransport` owned by this client
+        :param rate_limiter: the limiter throttling the requests,
+          defaults to one shared by all clients of the process
+        :param metadata_cache: the cache serving markets, futures and wallet
+          coins, None to always request them
+        :param single_flight: shares one request between identical concurrent
+          GETs, may be shared by several clients
+        :param codec: the JSON codec, defaults to the fastest one installed
+        :param models: return markets, orders, fills, trades, candles, positions
+          and balances as the compact `models` classes instead of dicts
+        :param metrics: collects the counts and timings of the requests,
+          may be shared by several clients
+        :param retry_policy: retries the requests failing with rate-limit,
+          server or network errors, None to raise right away
+        :param hedge: sends a second GET when the first one is slow
+        """
         self._api_key = key
         self._api_secret = secret
         self._api_subaccount = subaccount
         self._api_timeout = timeout
+        # imported on first use, so that importing the package does not load OpenSSL
+        import hashlib
+        import hmac
 
-    def _build_headers(self, scope: str, method: str, endpoint: str, query: dict):
-        endpoint = f"/api/{endpoint}"
-
-        headers = {
+        # keyed once, then copied for every request to sign
+        self._signature = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._public_headers = {
             "Accept": "application/json",
             "User-Agent": "FTX-Trader/1.0",
         }
+        self._private_headers = {
+            **self._public_headers,
+            # This header is REQUIRED to send JSON data.
+            "Content-Type": "application/json",
+            "FTX-KEY": key,
+        }
+        if subaccount:
+            # If you want to access a subaccount
+            self._private_headers["FTX-SUBACCOUNT"] = urllib.parse.quote(subaccount)
+        self._transport = transport if transport is not None else SessionTransport()
+        if rate_limiter is not None:
+            self._rate_limiter = rate_limiter
+        self._metadata_cache = metadata_cache
+        self._single_flight = single_flight
+        self._codec = codec if codec is not None else get_codec()
+        self._models = models
+        self._metrics = metrics
+        self._retry_policy = retry_policy
+        self._hedge = hedge
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self._rate_limiter
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        return self._metrics
+
+    def invalidate_metadata(self, endpoint: Optional[str] = None):
+        """
+        Drop cached metadata so that the next call requests it again.
+
+        :param endpoint: markets, futures or wallet/coins, None for all
+        """
+        if self._metadata_cache is not None:
+            self._metadata_cache.invalidate(endpoint)
+
+    def close(self):
+        self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _scope(self, endpoint: str) -> str:
+        # every private endpoint is named by its first path segment
+        if endpoint.partition("/")[0] in _PRIVATE_SEGMENTS:
+            return "private"
+        return "public"
+
+    def _flight_key(self, endpoint: str, query: Optional[dict]) -> tuple:
+        # private results depend on who is asking
+        return (
+            self._api_key,
+            self._api_subaccount,
+            endpoint,
+            urlencode(sorted((query or {}).items())),
+        )
 
-        if scope.lower() == "private":
-            nonce = str(helpers.get_current_timestamp())
-            payload = f"{nonce}{method.upper()}{endpoint}"
-            if method == "GET" and query:
-                payload += "?" + urlencode(query)
-            elif query:
-                payload += json.dumps(query)
-            sign = hmac.new(
-                bytes(self._api_secret, "utf-8"),
-                bytes(payload, "utf-8"),
-                hashlib.sha256,
-            ).hexdigest()
-
-            headers.update(
-                {
-                    # This header is REQUIRED to send JSON data.
-                    "Content-Type": "application/json",
-                    "FTX-KEY": self._api_key,
-                    "FTX-SIGN": sign,
-                    "FTX-TS": nonce,
-                }
+    def _prepare_request(self, method: str, endpoint: str, query: dict):
+        """
+        :return: the url, headers and encoded body of the request
+        """
+        target = endpoint
+        body = None
+        if query:
+            # the exact query string and body sent are the ones signed
+            if method == "GET":
+                target = f"{endpoint}?{urlencode(query, True, '/[]')}"
+            else:
+                body = self._codec.dumps(query)
+
+        if self._scope(endpoint) == "public":
+            url = f"{constants.PUBLIC_API_URL}/{target}"
+            return url, self._public_headers.copy(), body
+
+        nonce = str(helpers.get_current_timestamp())
+        signature = self._signature.copy()
+        signature.update(f"{nonce}{method}/api/{target}".encode("utf-8"))
+        if body is not None:
+            signature.update(body)
+
+        headers = self._private_headers.copy()
+        headers["FTX-SIGN"] = signature.hexdigest()
+        headers["FTX-TS"] = nonce
+        return f"{constants.PRIVATE_API_URL}/{target}", headers, body
+
+    def _handle_response(self, response: Response, payload):
+        """
+        :param response: the HTTP response
+        :param payload: its decoded body, None if it is not JSON
+        :return: the result of the request
+        """
+        status = response.status
+        error = payload.get("error") if isinstance(payload, dict) else None
+        if error is None and payload is None and status >= 400:
+            error = f"HTTP {status}: {response.content[:200]!r}"
+
+        if status == 429:
+            raise RateLimitExceeded(
+                error, status, helpers.parse_retry_after(response.headers)
             )
+        if status >= 500:
+            raise ServerError(error, status)
+        if isinstance(payload, dict) and "result" in payload:
+            return payload["result"]
+        if error is not None:
+            raise DoesntExist(error, status)
+        return payload
+
+    def _measure(self, method: str, endpoint: str):
+        # a no-op stand-in keeps the request path free of checks when disabled
+        if self._metrics is None:
+            return NO_SAMPLE
+        return self._metrics.sample(method, endpoint)
+
+    def _send_request(
+        self, method: str, endpoint: str, query: Optional[dict] = None, raw=False
+    ):
+        if method == "GET" and self._single_flight is not None:
+            return self._single_flight.do(
+                self._flight_key(endpoint, query) + (raw,),
+                lambda: self._request(method, endpoint, query, raw),
+                self._scope(endpoint) == "public",
+            )
+        return self._request(method, endpoint, query, raw)
+
+    def _request(
+        self, method: str, endpoint: str, query: Optional[dict] = None, raw=False
+    ):
+        call = functools.partial(self._attempt, method, endpoint, query, raw)
+        if self._hedge is not None and self._hedge.applies(method, endpoint):
+            call = functools.partial(self._hedge.run, endpoint, call)
+        if self._retry_policy is not None:
+            return self._retry_policy.run(method, endpoint, call)
+        return call()
+
+    def _attempt(
+        self, method: str, endpoint: str, query: Optional[dict] = None, raw=False
+    ):
+        with self._measure(method, endpoint) as sample:
+            self._rate_limiter.acquire(self._rate_limiter.weight(endpoint))
+            query = query or {}
+            sample.wait = sample.lap()
+
+            url, headers, body = self._prepare_request(method, endpoint, query)
+            sample.sign = sample.lap()
 
-            if self._api_subaccount:
-                headers.update(
-                    {
-                        # If you want to access a subaccount
-                        "FTX-SUBACCOUNT": urllib.parse.quote(self._api_subaccount)
-                    }
+            try:
+                response = self._transport.request(
+                    method, url, headers, body, self._api_timeout
                 )
+            except Exception as e:
+                raise NetworkError(f"{method} {endpoint}: {e!r}") from e
+            sample.network = sample.lap()
+            sample.status, sample.size = response.status, len(response.content)
 
-        return headers
+            return self._decode(response, raw, sample)
 
-    def _build_url(self, scope: str, method: str, endpoint: str, query: dict) -> str:
-        if scope.lower() == "private":
-            url = f"{constants.PRIVATE_API_URL}/{endpoint}"
-        else:
-            url = f"{constants.PUBLIC_API_URL}/{endpoint}"
+    def _decode(self, response: Response, raw: bool, sample):
+        if raw and response.status < 400:
+            return response.content
+        try:
+            payload = self._codec.loads(response.content)
+        except ValueError:
+            payload = None
+        sample.decode = sample.lap()
+        return self._handle_response(response, payload)
 
-        if method == "GET":
-            return f"{url}?{urlencode(query, True, '/[]')}" if len(query) > 0 else url
-        else:
-            return url
-
-    def _send_request(self, method: str, endpoint: str, query: Optional[dict] = None):
-        # .values() because of a bug in len(ExpiringDict)
-        if len(self._requests.values()) == constants.RATE_LIMIT_PER_SECOND:
-            print(
-                "waiting half a second because there have been "
-                f"{constants.RATE_LIMIT_PER_SECOND} requests in the past second.\n"
-                f"{method}: '{endpoint}' query='{query}'"
+    def request_raw(
+        self, method: str, endpoint: str, query: Optional[dict] = None
+    ) -> bytes:
+        """
+        Send a request and return the undecoded response body, for callers
+        parsing it themselves. Errors are still decoded and raised.
+
+        :param method: GET, POST or DELETE
+        :param endpoint: the endpoint after /api/, e.g. markets/BTC-PERP/candles
+        :param query: the query parameters or the JSON body
+        :return: the raw JSON response
+        """
+
+        return self._send_request(method, endpoint, query, raw=True)
+
+    def _paginate(self, fetch, cursor):
+        return pagination.iterate(fetch, cursor)
+
+    def _as(self, result, model):
+        # convert the results when the client returns models
+        return self._then(result, model.wrap) if self._models else result
+
+    def _then(self, result, callback):
+        # post-process a request result; AsyncClient chains it after awaiting instead
+        return callback(result)
+
+    def _resolved(self, value):
+        # a value already at hand, returned the way requests are
+        return value
+
+    def _get_metadata(self, endpoint: str, callback=None):
+        """
+        GET a metadata endpoint through the metadata cache, when there is one.
+
+        :param callback: applied to the result
+        """
+        cache = self._metadata_cache
+        callback = callback or (lambda result: result)
+        if cache is None:
+            return self._then(self._GET(endpoint), callback)
+
+        value, refresh = cache.peek(endpoint)
+        if refresh:
+            self._refresh_metadata(endpoint)
+        if value is MISSING:
+            return self._then(
+                self._GET(endpoint),
+                lambda result: callback(cache.store(endpoint, result)),
             )
-            sleep(.5)
-        query = query or {}
+        return self._resolved(callback(value))
 
-        scope = "public"
-        if any(endpoint.startswith(substr) for substr in constants.PRIVATE_ENDPOINTS):
-            scope = "private"
+    def _batch(self, calls: list, max_workers: int) -> BatchResult:
+        return batch.run(calls, max_workers)
 
-        # Build header first
-        headers = self._build_headers(scope, method, endpoint, query)
+    def _snapshot(self, fetch, index, interval: Optional[float]) -> Snapshot:
+        snapshot = Snapshot(fetch, index).refresh()
+        if interval:
+            snapshot.start(interval)
+        return snapshot
 
-        # Build final url here
-        url = self._build_url(scope, method, endpoint, query)
+    def _refresh_metadata(self, endpoint: str):
+        def refresh():
+            try:
+                self._metadata_cache.store(endpoint, self._GET(endpoint))
+            except Exception:
+                self._metadata_cache.refresh_failed(endpoint)
 
-        try:
-            if method == "GET":
-                response = requests.get(url, headers=headers).json()
-            elif method == "POST":
-                response = requests.post(url, headers=headers, json=query).json()
-            elif method == "DELETE":
-                response = requests.delete(url, headers=headers, json=query).json()
-        except Exception as e:
-            print("[x] Error: {}".format(e.args[0]))
-        finally:
-            # increment the number of requests in the past second
-            self._requests[dt.datetime.now()] = None
-
-        if "result" in response:
-            return response["result"]
-        elif "error" in response:
-            raise DoesntExist(response["error"])
-        else:
-            return response
+        threading.Thread(target=refresh, daemon=True).start()
 
     def _GET(self, endpoint, query=None):
         return self._send_request("GET", endpoint, query)
@@ -152,27 +351,39 @@ class Client:
         """
         https://docs.ftx.com/#markets
         """
-        return self._GET("markets")
+        return self._as(self._get_metadata("markets"), models.Market)
 
     def get_market(self, pair: str) -> dict:
         """
         https://docs.ftx.com/#get-single-market
         :param pair: the trading pair to query
         """
-        return self._GET(f"markets/{pair.upper()}")
+        if self._metadata_cache is not None:
+            result = self._get_metadata(
+                "markets",
+                lambda _: self._metadata_cache.find("markets", pair.upper()),
+            )
+        else:
+            result = self._GET(f"markets/{pair.upper()}")
+
+        return self._as(result, models.Market)
 
-    def get_orderbook(self, pair: str, depth: int = 20) -> BidsAndAsks:
+    def get_orderbook(
+        self, pair: str, depth: int = 20, as_arrays: bool = False
+    ) -> BidsAndAsks:
         """
         https://docs.ftx.com/#get-orderbook
 
         :param pair: the trading pair to query
         :param depth: the price levels depth to query (max: 100 default: 20)
+        :param as_arrays: return NumPy (levels, 2) price and size arrays
         :return: a dict contains asks and bids data
         """
         if depth > 100 or depth < 20:
             raise Invalid("depth must be between 20 and 100")
 
-        return self._GET(f"markets/{pair}/orderbook", {"depth": depth})
+        result = self._GET(f"markets/{pair}/orderbook", {"depth": depth})
+        return self._then(result, arrays.orderbook) if as_arrays else result
 
     def get_recent_trades(
         self,
@@ -180,6 +391,7 @@ class Client:
         limit: Optional[int] = constants.DEFAULT_LIMIT,
         start_time: Optional[int] = None,
         end_time: Optional[int] = None,
+        as_arrays: bool = False,
     ) -> ListOfDicts:
         """
         https://docs.ftx.com/#get-trades
@@ -188,13 +400,42 @@ class Client:
         :param limit: the records limit to query
         :param start_time: the target period after an Epoch time in seconds
         :param end_time: the target period before an Epoch time in seconds
+        :param as_arrays: return a NumPy structured array, see `arrays.trades`
         :return: a list contains all completed orders in exchange
         """
         query = helpers.build_query(
             limit=limit, start_time=start_time, end_time=end_time
         )
 
-        return self._GET(f"markets/{pair}/trades", query)
+        result = self._GET(f"markets/{pair}/trades", query)
+        if as_arrays:
+            return self._then(result, arrays.trades)
+        return self._as(result, models.Trade)
+
+    def iter_recent_trades(
+        self,
+        pair: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = constants.DEFAULT_PAGE_LIMIT,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_recent_trades` from `end_time` back to `start_time`
+
+        :param pair: the trading pair to query
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param limit: the records limit of each page
+        :return: an iterator over the trades, newest first
+        """
+        return self._paginate(
+            lambda start, end, limit=limit: self.get_recent_trades(
+                pair, limit, start, end
+            ),
+            pagination.Backward(
+                start_time, end_time, max_limit=constants.MAX_PAGE_LIMIT
+            ),
+        )
 
     def get_k_line(
         self,
@@ -203,6 +444,7 @@ class Client:
         limit: Optional[int] = constants.DEFAULT_LIMIT,
         start_time: Optional[int] = None,
         end_time: Optional[int] = None,
+        as_arrays: bool = False,
     ) -> ListOfDicts:
         """
         https://docs.ftx.com/#get-historical-prices
@@ -212,6 +454,7 @@ class Client:
         :param limit: the records limit to query
         :param start_time: the target period after an Epoch time in seconds
         :param end_time: the target period before an Epoch time in seconds
+        :param as_arrays: return a NumPy structured array, see `arrays.candles`
         :return: a list contains all OHLC prices in exchange
         """
         if resolution not in constants.VALID_K_LINE_RESOLUTIONS:
@@ -223,7 +466,37 @@ class Client:
             limit=limit, start_time=start_time, end_time=end_time, resolution=resolution
         )
 
-        return self._GET(f"markets/{pair}/candles", query)
+        result = self._GET(f"markets/{pair}/candles", query)
+        if as_arrays:
+            return self._then(result, arrays.candles)
+        return self._as(result, models.Candle)
+
+    def iter_k_line(
+        self,
+        pair: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+        resolution: int = constants.DEFAULT_K_LINE_RESOLUTION,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_k_line` from `start_time` to `end_time`
+
+        :param pair: the trading pair to query
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param resolution: the time period of K line in seconds
+        :return: an iterator over the OHLC prices, oldest first
+        """
+        return self._paginate(
+            lambda start, end: self.get_k_line(
+                pair, resolution, constants.MAX_K_LINE_LIMIT, start, end
+            ),
+            pagination.Forward(
+                start_time - start_time % resolution,
+                end_time,
+                resolution * (constants.MAX_K_LINE_LIMIT - 1),
+            ),
+        )
 
     def get_futures(self) -> ListOfDicts:
         """
@@ -232,7 +505,7 @@ class Client:
         :return: a list contains all available futures
         """
 
-        return self._GET("/futures")
+        return self._get_metadata("futures")
 
     def get_perpetual_futures(self) -> ListOfDicts:
         """
@@ -240,7 +513,10 @@ class Client:
 
         :return: a list contains all available perpetual futures
         """
-        return [future for future in self.get_futures() if future["perpetual"]]
+        return self._get_metadata(
+            "futures",
+            lambda futures: [future for future in futures if future["perpetual"]],
+        )
 
     def get_future(self, pair: str) -> dict:
         """
@@ -249,6 +525,11 @@ class Client:
         :param pair: the trading pair to query
         :return: a list contains single future info
         """
+        if self._metadata_cache is not None:
+            return self._get_metadata(
+                "futures",
+                lambda _: self._metadata_cache.find("futures", pair.upper()),
+            )
 
         return self._GET(f"futures/{pair.upper()}")
 
@@ -298,6 +579,7 @@ class Client:
         limit: Optional[int] = constants.DEFAULT_LIMIT,
         start_time: Optional[int] = None,
         end_time: Optional[int] = None,
+        as_arrays: bool = False,
     ) -> ListOfDicts:
         """
         https://docs.ftx.com/#get-historical-index
@@ -307,6 +589,7 @@ class Client:
         :param limit: the records limit to query
         :param start_time: the target period after an Epoch time in seconds
         :param end_time: the target period before an Epoch time in seconds
+        :param as_arrays: return a NumPy structured array, see `arrays.candles`
         :return: a list contains all OHLC prices of etf index in exchange
         """
         if resolution not in constants.VALID_K_LINE_RESOLUTIONS:
@@ -318,7 +601,37 @@ class Client:
             resolution=resolution, limit=limit, start_time=start_time, end_time=end_time
         )
 
-        return self._GET(f"indexes/{index}/candles", query)
+        result = self._GET(f"indexes/{index}/candles", query)
+        if as_arrays:
+            return self._then(result, arrays.candles)
+        return self._as(result, models.Candle)
+
+    def iter_index_k_line(
+        self,
+        index: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+        resolution: int = constants.DEFAULT_K_LINE_RESOLUTION,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_index_k_line` from `start_time` to `end_time`
+
+        :param index: the trading index to query
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param resolution: the time period of K line in seconds
+        :return: an iterator over the OHLC prices of etf index, oldest first
+        """
+        return self._paginate(
+            lambda start, end: self.get_index_k_line(
+                index, resolution, constants.MAX_K_LINE_LIMIT, start, end
+            ),
+            pagination.Forward(
+                start_time - start_time % resolution,
+                end_time,
+                resolution * (constants.MAX_K_LINE_LIMIT - 1),
+            ),
+        )
 
     # Private API
 
@@ -339,7 +652,58 @@ class Client:
         :return: a dict contains all positions
         """
 
-        return self._GET("positions", {"showAvgPrice": showAvgPrice})
+        return self._as(
+            self._GET("positions", {"showAvgPrice": showAvgPrice}), models.Position
+        )
+
+    def position_snapshot(
+        self, interval: Optional[float] = None, showAvgPrice: bool = False
+    ) -> Snapshot:
+        """
+        https://docs.ftx.com/#get-positions
+
+        :param interval: refresh in the background every `interval` seconds,
+          None to refresh only on demand
+        :param showAvgPrice: display AvgPrice or not
+        :return: a snapshot of the positions indexed by future
+        """
+
+        return self._snapshot(
+            lambda: self.get_positions(showAvgPrice),
+            lambda positions: {position["future"]: position for position in positions},
+            interval,
+        )
+
+    def get_portfolio_snapshot(self, showAvgPrice: bool = False) -> PortfolioSnapshot:
+        """
+        Fetch the account information, positions, balances, open orders and
+        open trigger orders concurrently, in about one round trip
+
+        :param showAvgPrice: display AvgPrice or not
+        :return: a snapshot indexing the positions by future, the balances by
+          coin and the orders by market, with the time skew between its parts
+        """
+
+        def received(result):
+            return result, time()
+
+        parts = {
+            "account": self.get_account_info,
+            "positions": lambda: self.get_positions(showAvgPrice),
+            "balances": self.get_balances,
+            "orders": self.get_open_orders,
+            "trigger_orders": self.get_open_trigger_orders,
+        }
+        calls = [
+            lambda fetch=fetch: self._then(fetch(), received) for fetch in parts.values()
+        ]
+        started = time()
+        return self._then(
+            self._batch(calls, len(calls)),
+            lambda batch: PortfolioSnapshot.assemble(
+                started, dict(zip(parts, batch.results))
+            ),
+        )
 
     def get_subaccounts(self) -> Union[list, ListOfDicts]:
         """
@@ -358,7 +722,7 @@ class Client:
         :return: a list contains subaccount balances
         """
 
-        return self._GET(f"subaccounts/{name}/balances")
+        return self._as(self._GET(f"subaccounts/{name}/balances"), models.Balance)
 
     def get_wallet_coins(self) -> ListOfDicts:
         """
@@ -367,7 +731,7 @@ class Client:
         :return: a list contains all coins in wallet
         """
 
-        return self._GET("wallet/coins")
+        return self._get_metadata("wallet/coins")
 
     def get_balances(self) -> ListOfDicts:
         """
@@ -376,7 +740,7 @@ class Client:
         :return: a list contains current account balances
         """
 
-        return self._GET("wallet/balances")
+        return self._as(self._GET("wallet/balances"), models.Balance)
 
     def get_balance(self, coin: str) -> dict:
         """
@@ -386,14 +750,30 @@ class Client:
         :return: a list contains current account single balance
         """
 
-        balance_coin = [
-            balance for balance in self.get_balances() if balance["coin"] == coin
-        ]
+        def find(balances):
+            balance_coin = [balance for balance in balances if balance["coin"] == coin]
+
+            if not balance_coin:
+                return None
 
-        if not balance_coin:
-            return None
+            return balance_coin[0]
 
-        return balance_coin[0]
+        return self._then(self.get_balances(), find)
+
+    def balance_snapshot(self, interval: Optional[float] = None) -> Snapshot:
+        """
+        https://docs.ftx.com/#get-balances
+
+        :param interval: refresh in the background every `interval` seconds,
+          None to refresh only on demand
+        :return: a snapshot of the balances indexed by coin
+        """
+
+        return self._snapshot(
+            self.get_balances,
+            lambda balances: {balance["coin"]: balance for balance in balances},
+            interval,
+        )
 
     def get_all_balances(self) -> Dict[str, ListOfDicts]:
         """
@@ -402,7 +782,36 @@ class Client:
         :return: a list contains all accounts balances
         """
 
-        return self._GET("wallet/all_balances")
+        result = self._GET("wallet/all_balances")
+        if not self._models:
+            return result
+
+        return self._then(
+            result,
+            lambda accounts: {
+                account: models.Balance.wrap(balances)
+                for account, balances in accounts.items()
+            },
+        )
+
+    def all_balances_snapshot(self, interval: Optional[float] = None) -> Snapshot:
+        """
+        https://docs.ftx.com/#get-balances-of-all-accounts
+
+        :param interval: refresh in the background every `interval` seconds,
+          None to refresh only on demand
+        :return: a snapshot of the balances indexed by (subaccount, coin)
+        """
+
+        return self._snapshot(
+            self.get_all_balances,
+            lambda accounts: {
+                (account, balance["coin"]): balance
+                for account, balances in accounts.items()
+                for balance in balances
+            },
+            interval,
+        )
 
     def get_deposit_address(self, coin: str, chain: Optional[str] = None) -> dict:
         """
@@ -442,6 +851,29 @@ class Client:
 
         return self._GET("wallet/deposits", query)
 
+    def iter_deposit_history(
+        self,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = constants.DEFAULT_PAGE_LIMIT,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_deposit_history` from `end_time` back to `start_time`
+
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param limit: the records limit of each page
+        :return: an iterator over the deposits, newest first
+        """
+        return self._paginate(
+            lambda start, end, limit=limit: self.get_deposit_history(
+                limit, start, end
+            ),
+            pagination.Backward(
+                start_time, end_time, max_limit=constants.MAX_PAGE_LIMIT
+            ),
+        )
+
     def get_withdrawal_history(
         self,
         limit: Optional[int] = constants.DEFAULT_LIMIT,
@@ -462,6 +894,29 @@ class Client:
 
         return self._GET("wallet/withdrawals", query)
 
+    def iter_withdrawal_history(
+        self,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = constants.DEFAULT_PAGE_LIMIT,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_withdrawal_history` from `end_time` back to `start_time`
+
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param limit: the records limit of each page
+        :return: an iterator over the withdrawals, newest first
+        """
+        return self._paginate(
+            lambda start, end, limit=limit: self.get_withdrawal_history(
+                limit, start, end
+            ),
+            pagination.Backward(
+                start_time, end_time, max_limit=constants.MAX_PAGE_LIMIT
+            ),
+        )
+
     def get_wallet_airdrops(
         self,
         limit: Optional[int] = constants.DEFAULT_LIMIT,
@@ -505,9 +960,28 @@ class Client:
 
         return self._GET("funding_payments", query)
 
+    def iter_funding_payments(
+        self,
+        coin: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_funding_payments` from `end_time` back to `start_time`
+
+        :param coin: the trading coin to query
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :return: an iterator over the funding payments, newest first
+        """
+        return self._paginate(
+            lambda start, end: self.get_funding_payments(coin, start, end),
+            pagination.Backward(start_time, end_time),
+        )
+
     def get_fills(
         self,
-        pair: str,
+        pair: Optional[str],
         limit: Optional[int] = constants.DEFAULT_LIMIT,
         start_time: Optional[int] = None,
         end_time: Optional[int] = None,
@@ -517,7 +991,7 @@ class Client:
         """
         https://docs.ftx.com/#fills
 
-        :param pair: the trading pair to query
+        :param pair: the trading pair to query, None for all pairs
         :param limit: the records limit to query
         :param start_time: the target period after an Epoch time in seconds
         :param end_time: the target period before an Epoch time in seconds
@@ -536,9 +1010,33 @@ class Client:
             order=order,
             orderId=orderId,
         )
-        query["market"] = pair
+        if pair is not None:
+            query["market"] = pair
 
-        return self._GET("fills", query)
+        return self._as(self._GET("fills", query), models.Fill)
+
+    def iter_fills(
+        self,
+        pair: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = constants.DEFAULT_PAGE_LIMIT,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_fills` from `end_time` back to `start_time`
+
+        :param pair: the trading pair to query, None for all pairs
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param limit: the records limit of each page
+        :return: an iterator over the fills, newest first
+        """
+        return self._paginate(
+            lambda start, end, limit=limit: self.get_fills(pair, limit, start, end),
+            pagination.Backward(
+                start_time, end_time, max_limit=constants.MAX_PAGE_LIMIT
+            ),
+        )
 
     def get_open_orders(self, pair=None):
         """
@@ -549,7 +1047,7 @@ class Client:
         """
         query = {"market": pair} if pair is not None else {}
 
-        return self._GET("orders", query)
+        return self._as(self._GET("orders", query), models.Order)
 
     def get_order_history(self, pair=None, start_time=None, end_time=None, limit=None):
         """
@@ -564,9 +1062,38 @@ class Client:
         query = helpers.build_query(
             end_time=end_time, start_time=start_time, limit=limit
         )
-        query["market"] = pair
+        if pair is not None:
+            query["market"] = pair
 
-        return self._GET("orders/history", query)
+        return self._as(self._GET("orders/history", query), models.Order)
+
+    def iter_order_history(
+        self,
+        pair: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = constants.DEFAULT_PAGE_LIMIT,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_order_history` from `end_time` back to `start_time`
+
+        :param pair: the trading pair to query, None for all pairs
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param limit: the records limit of each page
+        :return: an iterator over the orders, newest first
+        """
+        return self._paginate(
+            lambda start, end, limit=limit: self.get_order_history(
+                pair, start, end, limit
+            ),
+            pagination.Backward(
+                start_time,
+                end_time,
+                time_key="createdAt",
+                max_limit=constants.MAX_PAGE_LIMIT,
+            ),
+        )
 
     def get_open_trigger_orders(self, pair=None, type_=None):
         """
@@ -634,6 +1161,36 @@ class Client:
 
         return self._GET("conditional_orders/history", query)
 
+    def iter_trigger_order_history(
+        self,
+        pair: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = constants.DEFAULT_PAGE_LIMIT,
+        **filters,
+    ) -> Iterator[dict]:
+        """
+        Page through `get_trigger_order_history` from `end_time` back to `start_time`
+
+        :param pair: the trading pair to query, None for all pairs
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param limit: the records limit of each page
+        :param filters: side, type_ or orderType, see `get_trigger_order_history`
+        :return: an iterator over the trigger orders, newest first
+        """
+        return self._paginate(
+            lambda start, end, limit=limit: self.get_trigger_order_history(
+                pair, start, end, limit=limit, **filters
+            ),
+            pagination.Backward(
+                start_time,
+                end_time,
+                time_key="createdAt",
+                max_limit=constants.MAX_PAGE_LIMIT,
+            ),
+        )
+
     def get_order_status(self, orderId):
         """
         https://docs.ftx.com/#get-order-status
@@ -642,7 +1199,7 @@ class Client:
         :return a list contains status of the order
         """
 
-        return self._GET(f"orders/{orderId}")
+        return self._as(self._GET(f"orders/{orderId}"), models.Order)
 
     def get_order_status_by_clientId(self, clientId):
         """
@@ -652,7 +1209,7 @@ class Client:
         :return a list contains status of the order
         """
 
-        return self._GET(f"orders/by_client_id/{clientId}")
+        return self._as(self._GET(f"orders/by_client_id/{clientId}"), models.Order)
 
     # Private API (Write)
     def create_subaccount(self, name):
@@ -763,7 +1320,25 @@ class Client:
         if clientId is not None:
             query["clientId"] = clientId
 
-        return self._POST("orders", query)
+        return self._as(self._POST("orders", query), models.Order)
+
+    def create_orders(
+        self, orders: List[dict], max_workers: int = constants.DEFAULT_BATCH_WORKERS
+    ) -> BatchResult:
+        """
+        Place several orders concurrently, e.g. a quote ladder
+
+        :param orders: the keyword arguments of `create_order` for every order,
+          highest priority first
+        :param max_workers: the number of orders in flight at once
+        :return: the new order or the exception raised for every order,
+          in the same order, and the time the batch took
+        """
+
+        return self._batch(
+            [functools.partial(self.create_order, **order) for order in orders],
+            max_workers,
+        )
 
     def create_trigger_order(
         self,
@@ -831,7 +1406,30 @@ class Client:
         """
         query = helpers.build_query(clientId=clientId, size=size, price=price)
 
-        return self._POST(f"orders/{orderId}/modify", query)
+        return self._as(self._POST(f"orders/{orderId}/modify", query), models.Order)
+
+    def modify_orders(
+        self,
+        modifications: List[dict],
+        max_workers: int = constants.DEFAULT_BATCH_WORKERS,
+    ) -> BatchResult:
+        """
+        Modify several orders concurrently
+
+        :param modifications: the keyword arguments of `modify_order` for every
+          order, highest priority first
+        :param max_workers: the number of requests in flight at once
+        :return: the modified order or the exception raised for every order,
+          in the same order, and the time the batch took
+        """
+
+        return self._batch(
+            [
+                functools.partial(self.modify_order, **modification)
+                for modification in modifications
+            ],
+            max_workers,
+        )
 
     # TODO: Either price or size must be specified
     def modify_order_by_clientId(
@@ -855,7 +1453,10 @@ class Client:
 
         query = helpers.build_query(clientId=clientId, size=size, price=price)
 
-        return self._POST(f"orders/by_client_id/{clientOrderId}/modify", query)
+        return self._as(
+            self._POST(f"orders/by_client_id/{clientOrderId}/modify", query),
+            models.Order,
+        )
 
     def modify_trigger_order(
         self, orderId, _type, size, triggerPrice=None, orderPrice=None, trailValue=None
@@ -899,6 +1500,23 @@ class Client:
 
         return self._DELETE(f"orders/{orderId}")
 
+    def cancel_orders(
+        self, orderIds: List, max_workers: int = constants.DEFAULT_BATCH_WORKERS
+    ) -> BatchResult:
+        """
+        Cancel several orders concurrently
+
+        :param orderIds: the order IDs, highest priority first
+        :param max_workers: the number of requests in flight at once
+        :return: the result or the exception raised for every order,
+          in the same order, and the time the batch took
+        """
+
+        return self._batch(
+            [functools.partial(self.cancel_order, orderId) for orderId in orderIds],
+            max_workers,
+        )
+
     def cancel_order_by_clientID(self, clientId):
         """
         https://docs.ftx.com/#cancel-order-by-client-id
@@ -0,0 +1,144 @@
+"""
+Coalescing of identical concurrent GET requests
+"""
+import threading
+from time import monotonic
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Hashable, Tuple
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Future
+
+
+class _LeaderCancelled(Exception):
+    """The task performing a shared request was cancelled before it answered."""
+
+
+class SingleFlight:
+    """
+    Lets identical GET requests that overlap in time share one network call:
+    the first caller performs it and the others wait for its result, which is
+    the very same object for all of them and must not be mutated.
+
+    Results of public endpoints may additionally be reused for `window`
+    seconds after they arrive, e.g. a few milliseconds so that a burst of
+    threads asking for the same order book costs a single request.
+
+    :param window: the seconds public results are reused, 0 to disable
+    """
+
+    def __init__(self, window: float = 0.0):
+        self._window = window
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, "Future"] = {}
+        self._async_flights: Dict[Hashable, "asyncio.Future"] = {}
+        self._recent: Dict[Hashable, Tuple[float, object]] = {}
+
+    def _reuse(self, key: Hashable):
+        # called with the lock held
+        recent = self._recent.get(key)
+        if recent is None:
+            return False, None
+        if monotonic() >= recent[0]:
+            del self._recent[key]
+            return False, None
+        return True, recent[1]
+
+    def _remember(self, key: Hashable, result):
+        # called with the lock held; every entry lives `window` seconds, so
+        # moving the key to the end keeps the dict in expiry order and the
+        # expired entries, results of requests never repeated, at its start
+        now = monotonic()
+        self._recent.pop(key, None)
+        self._recent[key] = (now + self._window, result)
+        while True:
+            oldest = next(iter(self._recent))
+            if self._recent[oldest][0] > now:
+                break
+            del self._recent[oldest]
+
+    def do(self, key: Hashable, call: Callable, public: bool = False):
+        """
+        :param key: identifies the request
+        :param call: performs the request
+        :param public: whether the result may be reused within the window
+        :return: the result of `call`, possibly obtained by another thread
+        """
+        from concurrent.futures import Future
+
+        with self._lock:
+            if public and self._window:
+                found, result = self._reuse(key)
+                if found:
+                    return result
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+
+        if not leader:
+            return flight.result()
+
+        try:
+            result = call()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if public and self._window and flight.exception() is None:
+                    self._remember(key, flight.result())
+
+    async def do_async(
+        self, key: Hashable, call: Callable[[], Awaitable], public: bool = False
+    ):
+        """
+        Coroutine version of `do`, sharing flights between the tasks of a loop.
+        When the task performing the request is cancelled, one of the tasks
+        waiting for it sends the request again in its place.
+        """
+        import asyncio
+
+        with self._lock:
+            if public and self._window:
+                found, result = self._reuse(key)
+                if found:
+                    return result
+            flight = self._async_flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = asyncio.get_running_loop().create_future()
+                self._async_flights[key] = flight
+
+        if not leader:
+            try:
+                # shielded so that a cancelled follower does not cancel the others
+                return await asyncio.shield(flight)
+            except _LeaderCancelled:
+                # one of the followers leads the request again
+                return await self.do_async(key, call, public)
+
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # only the leader was cancelled, its followers still want the result
+            flight.set_exception(_LeaderCancelled())
+            flight.exception()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # retrieved here so that an unwaited flight does not log a warning
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._async_flights[key]
+                if public and self._window and flight.exception() is None:
+                    self._remember(key, flight.result())
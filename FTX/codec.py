@@ -0,0 +1,109 @@
+"""
+JSON codecs used to encode request bodies and decode responses
+"""
+from typing import Optional
+
+
+class Codec:
+    """
+    Interface of a JSON codec.
+
+    Subclass it and implement `dumps` and `loads` to plug another JSON library
+    into `Client`.
+    """
+
+    name = "abstract"
+
+    def dumps(self, obj) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes):
+        raise NotImplementedError
+
+
+class StdlibCodec(Codec):
+    name = "json"
+
+    def __init__(self):
+        import json
+
+        self._dumps = json.JSONEncoder(separators=(",", ":")).encode
+        self._loads = json.loads
+
+    def dumps(self, obj) -> bytes:
+        return self._dumps(obj).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return self._loads(data)
+
+
+class OrjsonCodec(Codec):
+    """
+    Requires the optional `orjson` package.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+        self._option = orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj) -> bytes:
+        return self._dumps(obj, default=_default, option=self._option)
+
+    def loads(self, data: bytes):
+        return self._loads(data)
+
+
+class UjsonCodec(Codec):
+    """
+    Requires the optional `ujson` package.
+    """
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._dumps = ujson.dumps
+        self._loads = ujson.loads
+
+    def dumps(self, obj) -> bytes:
+        return self._dumps(obj).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return self._loads(data)
+
+
+def _default(obj):
+    # orjson leaves out subclasses of float, e.g. numpy.float64
+    if isinstance(obj, float):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+CODECS = {codec.name: codec for codec in (OrjsonCodec, UjsonCodec, StdlibCodec)}
+
+_default_codec: Optional[Codec] = None
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    :param name: orjson, ujson or json, None for the fastest one installed
+    :return: the codec
+    """
+    global _default_codec
+
+    if name is not None:
+        return CODECS[name]()
+    if _default_codec is None:
+        for codec in CODECS.values():
+            try:
+                _default_codec = codec()
+                break
+            except ImportError:
+                continue
+    return _default_codec
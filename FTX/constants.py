@@ -18,3 +18,35 @@ PRIVATE_ENDPOINTS = (
 )
 VALID_CHAINS = ("omni", "erc20", "trx", "sol", "bep2")
 RATE_LIMIT_PER_SECOND = 30
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_ASYNC_POOL_LIMIT = 100
+DEFAULT_PAGE_LIMIT = 100
+# the largest page of the history endpoints, for seconds holding more records
+MAX_PAGE_LIMIT = 5_000
+MAX_K_LINE_LIMIT = 1_500
+# the values of a candle, in the order CandleStore records and arrays hold them
+CANDLE_FIELDS = ("time", "open", "high", "low", "close", "volume")
+DEFAULT_BACKFILL_WORKERS = 8
+DEFAULT_BACKFILL_RETRIES = 3
+WEBSOCKET_URL = "wss://ftx.com/ws/"
+WEBSOCKET_PING_INTERVAL = 15
+PRIVATE_CHANNELS = ("fills", "orders")
+# seconds the results of the metadata endpoints stay cached
+METADATA_TTLS = {"markets": 60, "futures": 60, "wallet/coins": 600}
+# the field identifying the items of each metadata endpoint
+METADATA_KEYS = {"markets": "name", "futures": "name", "wallet/coins": "id"}
+DEFAULT_BATCH_WORKERS = 8
+# rows the history store upserts per transaction
+DEFAULT_HISTORY_CHUNK_SIZE = 5_000
+# upper bounds in seconds of the request latency histogram buckets
+METRICS_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 0.1
+DEFAULT_RETRY_MAX_BACKOFF = 5.0
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_HEDGE_SAMPLES = 200
+DEFAULT_HEDGE_MIN_SAMPLES = 20
@@ -0,0 +1,46 @@
+"""
+Exceptions raised by the FTX client
+"""
+from typing import Optional
+
+
+class FTXError(Exception):
+    """Base class of every error raised by the client."""
+
+
+class Invalid(FTXError):
+    pass
+
+
+class DoesntExist(FTXError):
+    """
+    The API answered with an error.
+
+    :param status: the HTTP status of the response, when there was one
+    """
+
+    def __init__(self, message, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimitExceeded(DoesntExist):
+    """
+    The API refused the request for exceeding the rate limit (HTTP 429).
+
+    :param retry_after: the seconds to wait as told by the server, if it did
+    """
+
+    def __init__(
+        self, message, status: Optional[int] = 429, retry_after: Optional[float] = None
+    ):
+        super().__init__(message, status)
+        self.retry_after = retry_after
+
+
+class ServerError(DoesntExist):
+    """The API failed to handle the request (HTTP 5xx)."""
+
+
+class NetworkError(FTXError):
+    """The request did not get a response, e.g. a timeout or a reset connection."""
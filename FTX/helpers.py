@@ -1,3 +1,4 @@
+from datetime import datetime as _datetime
 from time import time as _time
 
 
@@ -11,3 +12,26 @@ def build_query(**kwargs):
         if value is not None:
             query[key] = value
     return query
+
+
+def parse_time(value):
+    """
+    :param value: an ISO 8601 string or an Epoch time in milliseconds,
+      the two shapes of times in FTX responses
+    :return: the Epoch time in seconds
+    """
+    if isinstance(value, str):
+        return _datetime.fromisoformat(value).timestamp()
+    return value / 1_000
+
+
+def parse_retry_after(headers):
+    """
+    :param headers: the response headers
+    :return: the seconds of the Retry-After header, None if absent or a date
+    """
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,330 @@
+"""
+Local SQLite store of the account history with incremental sync
+"""
+import hashlib
+import os
+import sqlite3
+from itertools import islice
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from . import constants
+from . import helpers
+from .codec import Codec, get_codec
+from .exceptions import Invalid
+from .models import Model
+
+
+class Table(NamedTuple):
+    """
+    How one history endpoint is stored.
+
+    :param name: the table name
+    :param method: the `Client.iter_*` method paging through the endpoint
+    :param columns: the (column, record field) pairs stored besides the id,
+      the time and the whole record
+    :param time_key: the record field holding its time
+    :param final: the statuses after which a record no longer changes, None
+      when records never change once returned
+    :param indexes: the column lists to index
+    """
+
+    name: str
+    method: str
+    columns: Tuple[Tuple[str, str], ...]
+    time_key: str = "time"
+    final: Optional[Tuple[str, ...]] = None
+    indexes: Tuple[Tuple[str, ...], ...] = ()
+
+
+TABLES: Dict[str, Table] = {
+    table.name: table
+    for table in (
+        Table(
+            "fills",
+            "iter_fills",
+            (("market", "market"), ("orderId", "orderId"), ("side", "side")),
+            indexes=(("market", "time"), ("orderId",), ("time",)),
+        ),
+        Table(
+            "orders",
+            "iter_order_history",
+            (("market", "market"), ("side", "side"), ("status", "status")),
+            time_key="createdAt",
+            final=("closed",),
+            indexes=(("market", "time"), ("time",)),
+        ),
+        Table(
+            "funding_payments",
+            "iter_funding_payments",
+            (("market", "future"),),
+            indexes=(("market", "time"), ("time",)),
+        ),
+        Table(
+            "deposits",
+            "iter_deposit_history",
+            (("coin", "coin"), ("status", "status")),
+            final=("confirmed", "cancelled"),
+            indexes=(("coin", "time"), ("time",)),
+        ),
+        Table(
+            "withdrawals",
+            "iter_withdrawal_history",
+            (("coin", "coin"), ("status", "status")),
+            final=("complete", "cancelled"),
+            indexes=(("coin", "time"), ("time",)),
+        ),
+    )
+}
+
+
+class HistoryStore:
+    """
+    Fills, orders, funding payments, deposits and withdrawals of one account
+    kept in a SQLite file. Every table remembers a high-watermark, so a sync
+    only pages through the records newer than the previous one and upserts
+    them by id, `chunk_size` rows per transaction.
+
+        store = HistoryStore.for_account(key, subaccount, "~/.ftx/history")
+        store.sync(client, start_time=1609459200)
+        fills = store.records("fills", market="BTC-PERP", start_time=1612137600)
+
+    Orders, deposits and withdrawals change status after they are created, so
+    their watermark stays at the oldest one which had not settled yet and the
+    next sync fetches it again.
+
+    The watermark of a table moves in the transaction writing its last rows,
+    so an interrupted sync starts over from the previous one.
+
+    :param path: the database file, created if missing
+    :param codec: the JSON codec of the stored records, defaults to the fastest
+      installed
+    :param chunk_size: the rows written per transaction
+    """
+
+    def __init__(
+        self,
+        path: str,
+        codec: Optional[Codec] = None,
+        chunk_size: int = constants.DEFAULT_HISTORY_CHUNK_SIZE,
+    ):
+        self.path = os.path.expanduser(path)
+        self._codec = codec if codec is not None else get_codec()
+        self._chunk_size = chunk_size
+        self._connection = sqlite3.connect(self.path)
+        # readers do not block the sync, and commits do not wait for the disk
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state "
+                "(name TEXT PRIMARY KEY, watermark REAL NOT NULL)"
+            )
+            for table in TABLES.values():
+                columns = "".join(f", {column}" for column, _ in table.columns)
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table.name} (id INTEGER PRIMARY "
+                    f"KEY, time REAL NOT NULL{columns}, data TEXT NOT NULL)"
+                )
+                for index in table.indexes:
+                    self._connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table.name}_{'_'.join(index)} "
+                        f"ON {table.name} ({', '.join(index)})"
+                    )
+
+    @classmethod
+    def for_account(
+        cls,
+        key: str,
+        subaccount: Optional[str] = None,
+        directory: str = ".",
+        **kwargs,
+    ) -> "HistoryStore":
+        """
+        The store of the given API key and subaccount in `directory`.
+
+        :param key: the API key
+        :param subaccount: the subaccount, None for the main account
+        :param directory: the directory holding the stores, created if missing
+        """
+        directory = os.path.expanduser(directory)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256(f"{key}\0{subaccount or ''}".encode("utf-8"))
+        return cls(
+            os.path.join(directory, f"ftx-history-{digest.hexdigest()[:16]}.sqlite3"),
+            **kwargs,
+        )
+
+    def watermark(self, name: str) -> Optional[float]:
+        """
+        :return: the time the next sync of the table starts from, None when
+          it was never synced
+        """
+        row = self._connection.execute(
+            "SELECT watermark FROM sync_state WHERE name = ?", (self._table(name).name,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    @staticmethod
+    def _table(name: str) -> Table:
+        try:
+            return TABLES[name]
+        except KeyError:
+            raise Invalid(f"no history table {name!r}, one of {list(TABLES)}")
+
+    def _row(self, table: Table, record) -> tuple:
+        if isinstance(record, Model):
+            record = record.to_dict()
+        return (
+            record["id"],
+            helpers.parse_time(record[table.time_key]),
+            *(record.get(field) for _, field in table.columns),
+            self._codec.dumps(record).decode("utf-8"),
+        )
+
+    def _write(self, table: Table, rows: List[tuple], finish: bool = False):
+        marks = ", ".join("?" * (len(table.columns) + 3))
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {table.name} VALUES ({marks})", rows
+            )
+            watermark = self._next_watermark(table) if finish else None
+            if watermark is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                    (table.name, watermark),
+                )
+
+    def _next_watermark(self, table: Table) -> Optional[float]:
+        if table.final is not None:
+            unsettled = self._connection.execute(
+                f"SELECT min(time) FROM {table.name} WHERE status IS NULL OR "
+                f"status NOT IN ({', '.join('?' * len(table.final))})",
+                table.final,
+            ).fetchone()[0]
+            if unsettled is not None:
+                return unsettled
+        return self._connection.execute(
+            f"SELECT max(time) FROM {table.name}"
+        ).fetchone()[0]
+
+    def _start(self, table: Table, start_time: Optional[int]) -> Optional[int]:
+        # the endpoints take whole seconds; records of the watermark second
+        # come back again and are upserted over themselves
+        watermark = self.watermark(table.name)
+        return start_time if watermark is None else int(watermark)
+
+    def _names(self, tables: Optional[Iterable[str]]) -> List[Table]:
+        return [self._table(name) for name in (tables or TABLES)]
+
+    def sync(
+        self,
+        client,
+        tables: Optional[Iterable[str]] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Fetch the records of every table newer than its watermark, or from
+        `start_time` when it was never synced, and upsert them.
+
+        :param client: the `Client` to fetch with
+        :param tables: the tables to sync, None for all of `TABLES`
+        :param start_time: where to start a table never synced, an Epoch time
+          in seconds, None for the whole history
+        :param end_time: the target period before an Epoch time in seconds
+        :return: the number of records written to each table
+        """
+        written = {}
+        for table in self._names(tables):
+            records = getattr(client, table.method)(
+                start_time=self._start(table, start_time), end_time=end_time
+            )
+            rows = (self._row(table, record) for record in records)
+            written[table.name] = 0
+            while True:
+                chunk = list(islice(rows, self._chunk_size))
+                self._write(table, chunk, finish=len(chunk) < self._chunk_size)
+                written[table.name] += len(chunk)
+                if len(chunk) < self._chunk_size:
+                    break
+        return written
+
+    async def sync_async(
+        self,
+        client,
+        tables: Optional[Iterable[str]] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        `sync` with an `AsyncClient`.
+        """
+        written = {}
+        for table in self._names(tables):
+            records = getattr(client, table.method)(
+                start_time=self._start(table, start_time), end_time=end_time
+            )
+            chunk = []
+            written[table.name] = 0
+            async for record in records:
+                chunk.append(self._row(table, record))
+                if len(chunk) == self._chunk_size:
+                    self._write(table, chunk)
+                    written[table.name] += len(chunk)
+                    chunk = []
+            self._write(table, chunk, finish=True)
+            written[table.name] += len(chunk)
+        return written
+
+    def records(
+        self,
+        name: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        **where,
+    ) -> List[dict]:
+        """
+        Query the stored records, without any request.
+
+            store.records("fills", orderId=123456789)
+            store.records("orders", market="BTC-PERP", status="open")
+
+        :param name: the table, one of `TABLES`
+        :param start_time: the target period after an Epoch time in seconds
+        :param end_time: the target period before an Epoch time in seconds
+        :param where: columns of the table and the values to match
+        :return: a list contains the records, oldest first
+        """
+        table = self._table(name)
+        columns = {column for column, _ in table.columns}
+        unknown = set(where) - columns
+        if unknown:
+            raise Invalid(
+                f"{name} has no columns {sorted(unknown)}, only {sorted(columns)}"
+            )
+
+        clauses, values = [], []
+        if start_time is not None:
+            clauses.append("time >= ?")
+            values.append(start_time)
+        if end_time is not None:
+            clauses.append("time <= ?")
+            values.append(end_time)
+        for column, value in where.items():
+            clauses.append(f"{column} = ?")
+            values.append(value)
+        condition = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        cursor = self._connection.execute(
+            f"SELECT data FROM {name}{condition} ORDER BY time, id", values
+        )
+        return [self._codec.loads(data) for data, in cursor]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,253 @@
+"""
+Per-endpoint request metrics, see `Client(metrics=Metrics())`
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import constants
+
+PHASES = ("wait", "sign", "network", "decode")
+
+# ids in paths would give every order its own series
+_IDS = re.compile(r"(?<=/)(\d+|(?<=by_client_id/)[^/]+)(?=/|$)")
+
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    :param endpoint: e.g. orders/by_client_id/my-order/modify
+    :return: the endpoint with its ids replaced, e.g. orders/by_client_id/:id/modify
+    """
+    return _IDS.sub(":id", endpoint)
+
+
+class Sample:
+    """
+    The timings of one request, filled in while it runs. `lap` returns the
+    seconds since the previous lap, for the phase that just ended.
+    """
+
+    __slots__ = (
+        "_metrics",
+        "_last",
+        "method",
+        "endpoint",
+        "status",
+        "size",
+        "error",
+        "wait",
+        "sign",
+        "network",
+        "decode",
+    )
+
+    def __init__(self, metrics: "Metrics", method: str, endpoint: str):
+        self._metrics = metrics
+        self.method = method
+        self.endpoint = endpoint
+        self.status = None
+        self.size = 0
+        self.error = None
+        self.wait = self.sign = self.network = self.decode = 0.0
+        self._last = perf_counter()
+
+    def lap(self) -> float:
+        now = perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        return elapsed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self._metrics.record(self)
+
+
+class _NoSample:
+    """Stands in for `Sample` when metrics are disabled, recording nothing."""
+
+    __slots__ = Sample.__slots__
+
+    # float() is 0.0, and cheaper to call than a method
+    lap = staticmethod(float)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        pass
+
+
+NO_SAMPLE = _NoSample()
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # the last count is the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": dict(zip(map(str, self.buckets), self.counts)),
+            "inf": self.counts[-1],
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class EndpointMetrics:
+    __slots__ = ("requests", "bytes", "errors", "latency")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.requests = 0
+        self.bytes = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.latency = {phase: Histogram(buckets) for phase in PHASES}
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "errors": dict(self.errors),
+            "latency": {
+                phase: histogram.to_dict() for phase, histogram in self.latency.items()
+            },
+        }
+
+
+class Metrics:
+    """
+    Thread-safe collector of request counts, errors, bytes received and
+    latency histograms for the wait on the rate limiter, signing, the network
+    round trip and decoding, per method and endpoint. May be shared by
+    several clients.
+
+        >>> metrics = Metrics()
+        >>> client = Client(key, secret, metrics=metrics)
+        >>> metrics.on_request(lambda sample: print(sample.endpoint, sample.network))
+        >>> print(metrics.to_prometheus())
+
+    :param buckets: the upper bounds of the histogram buckets in seconds
+    """
+
+    def __init__(self, buckets: Sequence[float] = constants.METRICS_BUCKETS):
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._hooks: List[Callable[[Sample], None]] = []
+
+    def on_request(self, callback: Callable[[Sample], None]):
+        """
+        :param callback: called with the `Sample` of every finished request,
+          on the thread or event loop that sent it
+        """
+        self._hooks.append(callback)
+
+    def sample(self, method: str, endpoint: str) -> Sample:
+        return Sample(self, method, endpoint_label(endpoint))
+
+    def record(self, sample: Sample):
+        key = (sample.method, sample.endpoint)
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = EndpointMetrics(self._buckets)
+            endpoint.requests += 1
+            endpoint.bytes += sample.size
+            if sample.error is not None:
+                endpoint.errors[sample.error] += 1
+            for phase in PHASES:
+                endpoint.latency[phase].observe(getattr(sample, phase))
+        for hook in self._hooks:
+            hook(sample)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        :return: the metrics of every endpoint, keyed by "METHOD endpoint"
+        """
+        with self._lock:
+            return {
+                f"{method} {endpoint}": metrics.to_dict()
+                for (method, endpoint), metrics in sorted(self._endpoints.items())
+            }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        import json
+
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "ftx") -> str:
+        """
+        :return: the metrics in the Prometheus text exposition format
+        """
+        lines = []
+
+        def family(name, kind, help_):
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            labels = {
+                key: f'method="{key[0]}",endpoint="{key[1]}"' for key, _ in endpoints
+            }
+
+            family("requests_total", "counter", "Requests sent")
+            for key, metrics in endpoints:
+                lines.append(
+                    f"{prefix}_requests_total{{{labels[key]}}} {metrics.requests}"
+                )
+
+            family("request_errors_total", "counter", "Requests that raised")
+            for key, metrics in endpoints:
+                for error, count in sorted(metrics.errors.items()):
+                    label = f'{labels[key]},error="{error}"'
+                    lines.append(f"{prefix}_request_errors_total{{{label}}} {count}")
+
+            family("response_bytes_total", "counter", "Response body bytes received")
+            for key, metrics in endpoints:
+                lines.append(
+                    f"{prefix}_response_bytes_total{{{labels[key]}}} {metrics.bytes}"
+                )
+
+            family(
+                "request_phase_seconds",
+                "histogram",
+                "Seconds spent waiting on the rate limiter, signing, "
+                "on the network and decoding",
+            )
+            for key, metrics in endpoints:
+                for phase, histogram in metrics.latency.items():
+                    series = f"{prefix}_request_phase_seconds"
+                    label = f'{labels[key]},phase="{phase}"'
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*map(str, histogram.buckets), "+Inf"), histogram.counts
+                    ):
+                        cumulative += count
+                        bucket = f'{label},le="{bound}"'
+                        lines.append(f"{series}_bucket{{{bucket}}} {cumulative}")
+                    lines.append(f"{series}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{series}_count{{{label}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
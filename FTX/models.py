@@ -0,0 +1,201 @@
+"""
+Typed, compact result models, see `Client(models=True)`.
+
+Every model keeps the fields of its FTX payload, named as in the API docs,
+in `__slots__` instead of a per-record dict, and still supports the
+`record["field"]` and `record.get("field")` access of the dict results.
+Fields missing from a payload are None, fields not listed are dropped.
+"""
+from collections.abc import Sequence
+
+
+class Model:
+    __slots__ = ()
+
+    def __init__(self, payload: dict):
+        for name in self.__slots__:
+            setattr(self, name, payload.get(name))
+
+    @classmethod
+    def wrap(cls, result):
+        """
+        :param result: a decoded payload, or a list of them
+        :return: a model, or a `ModelList` converting the records lazily
+        """
+        if type(result) is dict:
+            return cls(result)
+        if type(result) is list:
+            return ModelList(cls, result)
+        return result
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ModelList(Sequence):
+    """
+    A list of payloads turned into models on first access. Each converted
+    model replaces its payload, so the dicts are freed as the list is read.
+    """
+
+    __slots__ = ("_model", "_items")
+
+    def __init__(self, model: type, payloads: list):
+        self._model = model
+        # a copy, as the payloads may be shared, e.g. by the metadata cache
+        self._items = list(payloads)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if type(item) is dict:
+            item = self._items[index] = self._model(item)
+        return item
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (ModelList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class Market(Model):
+    __slots__ = (
+        "name",
+        "type",
+        "baseCurrency",
+        "quoteCurrency",
+        "underlying",
+        "enabled",
+        "postOnly",
+        "restricted",
+        "highLeverageFeeExempt",
+        "priceIncrement",
+        "sizeIncrement",
+        "minProvideSize",
+        "price",
+        "bid",
+        "ask",
+        "last",
+        "change1h",
+        "change24h",
+        "changeBod",
+        "quoteVolume24h",
+        "volumeUsd24h",
+    )
+
+
+class Order(Model):
+    __slots__ = (
+        "id",
+        "clientId",
+        "market",
+        "future",
+        "type",
+        "side",
+        "price",
+        "size",
+        "status",
+        "filledSize",
+        "remainingSize",
+        "avgFillPrice",
+        "reduceOnly",
+        "ioc",
+        "postOnly",
+        "liquidation",
+        "createdAt",
+    )
+
+
+class Fill(Model):
+    __slots__ = (
+        "id",
+        "market",
+        "future",
+        "baseCurrency",
+        "quoteCurrency",
+        "type",
+        "side",
+        "price",
+        "size",
+        "orderId",
+        "tradeId",
+        "time",
+        "fee",
+        "feeRate",
+        "feeCurrency",
+        "liquidity",
+    )
+
+
+class Trade(Model):
+    __slots__ = ("id", "price", "size", "side", "liquidation", "time")
+
+
+class Candle(Model):
+    __slots__ = ("startTime", "time", "open", "high", "low", "close", "volume")
+
+
+class Position(Model):
+    __slots__ = (
+        "future",
+        "side",
+        "size",
+        "netSize",
+        "longOrderSize",
+        "shortOrderSize",
+        "openSize",
+        "cost",
+        "entryPrice",
+        "estimatedLiquidationPrice",
+        "unrealizedPnl",
+        "realizedPnl",
+        "collateralUsed",
+        "initialMarginRequirement",
+        "maintenanceMarginRequirement",
+        "recentAverageOpenPrice",
+        "recentBreakEvenPrice",
+        "recentPnl",
+        "cumulativeBuySize",
+        "cumulativeSellSize",
+    )
+
+
+class Balance(Model):
+    __slots__ = (
+        "coin",
+        "free",
+        "total",
+        "usdValue",
+        "spotBorrow",
+        "availableWithoutBorrow",
+    )
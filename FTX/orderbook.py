@@ -0,0 +1,174 @@
+"""
+Sorted, array-backed order book
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import zip_longest
+from typing import Optional, Tuple
+import zlib
+
+SIDES = ("bids", "asks")
+
+
+class _Levels:
+    """
+    Prices and sizes of one side, sorted ascending by price, in `array('d')`
+    buffers with spare capacity. Shifting levels rewrites slices in place, so the
+    buffers never resize while memoryviews over them are alive.
+    """
+
+    def __init__(self, levels=(), capacity: int = 64):
+        levels = sorted((price, size) for price, size in levels if size)
+        self.length = len(levels)
+        capacity = max(capacity, 2 * self.length)
+        padding = array("d", [0.0]) * (capacity - self.length)
+        self.prices = array("d", (price for price, _ in levels)) + padding
+        self.sizes = array("d", (size for _, size in levels)) + padding
+
+    def find(self, price: float) -> Tuple[int, bool]:
+        index = bisect_left(self.prices, price, 0, self.length)
+        return index, index < self.length and self.prices[index] == price
+
+    def insert(self, index: int, price: float, size: float):
+        length = self.length
+        if length == len(self.prices):
+            # views handed out keep the old buffers alive
+            self.prices = self.prices + array("d", [0.0]) * length
+            self.sizes = self.sizes + array("d", [0.0]) * length
+        # empty slice assignments count as resizes for arrays, skip them
+        if index < length:
+            self.prices[index + 1:length + 1] = self.prices[index:length]
+            self.sizes[index + 1:length + 1] = self.sizes[index:length]
+        self.prices[index] = price
+        self.sizes[index] = size
+        self.length += 1
+
+    def remove(self, index: int):
+        length = self.length
+        if index < length - 1:
+            self.prices[index:length - 1] = self.prices[index + 1:length]
+            self.sizes[index:length - 1] = self.sizes[index + 1:length]
+        self.length -= 1
+
+
+class OrderBook:
+    """
+    Price levels of one market kept in contiguous `array('d')` storage sorted
+    by price, the best bid being the last bid and the best ask the first ask.
+    A level is found by binary search in O(log n); adding or removing one shifts
+    the contiguous memory behind it, which for books of a few thousand levels
+    costs less than maintaining a tree.
+
+    Slices returned by `top` are memoryviews over the storage, not copies,
+    and describe the book as it was when they were taken only until the next
+    update.
+
+        >>> book = OrderBook(client.get_orderbook("BTC-PERP", 100))
+        >>> book.update({"bids": [[2259.5, 0.0]], "asks": [[2299.5, 1.5]]})
+        >>> book.best_bid(), book.spread()
+        >>> prices, sizes = book.top("asks", 10)
+
+    :param snapshot: a dict contains bids and asks lists of [price, size],
+      e.g. a `Client.get_orderbook` result or a websocket partial
+    """
+
+    def __init__(self, snapshot: Optional[dict] = None):
+        self._sides = {side: _Levels() for side in SIDES}
+        if snapshot is not None:
+            self.reset(snapshot)
+
+    def reset(self, snapshot: dict):
+        self._sides = {side: _Levels(snapshot[side]) for side in SIDES}
+
+    def set(self, side: str, price: float, size: float):
+        """
+        :param side: bids or asks
+        :param price: the price of the level
+        :param size: the new size of the level, 0 to remove it
+        """
+        levels = self._sides[side]
+        index, found = levels.find(price)
+
+        if size:
+            if found:
+                levels.sizes[index] = size
+            else:
+                levels.insert(index, price, size)
+        elif found:
+            levels.remove(index)
+
+    def update(self, data: dict):
+        """
+        :param data: a dict contains bids and asks lists of changed [price, size]
+        """
+        for side in SIDES:
+            for price, size in data.get(side, ()):
+                self.set(side, price, size)
+
+    def __len__(self) -> int:
+        return self._sides["bids"].length + self._sides["asks"].length
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        bids = self._sides["bids"]
+        if not bids.length:
+            return None
+        return bids.prices[bids.length - 1], bids.sizes[bids.length - 1]
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        asks = self._sides["asks"]
+        if not asks.length:
+            return None
+        return asks.prices[0], asks.sizes[0]
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def size_at(self, side: str, price: float) -> float:
+        """
+        :return: the size resting at exactly `price`, 0 if there is no such level
+        """
+        levels = self._sides[side]
+        index, found = levels.find(price)
+        return levels.sizes[index] if found else 0.0
+
+    def cumulative_size(self, side: str, price: float) -> float:
+        """
+        :return: the total size of the levels priced at `price` or better
+        """
+        levels = self._sides[side]
+        sizes = memoryview(levels.sizes)
+        if side == "bids":
+            start = bisect_left(levels.prices, price, 0, levels.length)
+            return sum(sizes[start:levels.length])
+        return sum(sizes[:bisect_right(levels.prices, price, 0, levels.length)])
+
+    def top(self, side: str, n: int) -> Tuple[memoryview, memoryview]:
+        """
+        :param side: bids or asks
+        :param n: the number of levels
+        :return: the prices and sizes of the best `n` levels, best first
+        """
+        levels = self._sides[side]
+        prices, sizes = memoryview(levels.prices), memoryview(levels.sizes)
+        if side == "asks":
+            end = min(n, levels.length)
+            return prices[:end], sizes[:end]
+        start = max(levels.length - n, 0)
+        return (
+            prices[start:levels.length][::-1],
+            sizes[start:levels.length][::-1],
+        )
+
+    def checksum(self) -> int:
+        """
+        :return: the CRC32 FTX computes over the best 100 levels of each side
+        """
+        bids, asks = (zip(*self.top(side, 100)) for side in SIDES)
+        levels = (
+            ":".join(f"{order[0]}:{order[1]}" for order in pair if order)
+            for pair in zip_longest(bids, asks)
+        )
+        return zlib.crc32(":".join(levels).encode("utf-8"))
@@ -0,0 +1,182 @@
+"""
+Cursors walking the time-windowed FTX history endpoints page by page
+"""
+import math
+import warnings
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from . import helpers
+
+
+class Backward:
+    """
+    Walks an endpoint returning the newest records first, from `end_time`
+    back to `start_time`, moving `end_time` to the oldest record of each page.
+
+    Records sharing the boundary second come back on the next page and are
+    dropped by id; only the ids of that second are remembered. Should a whole
+    page share one second, that second is fetched again with `max_limit`
+    records per page; should even that page be full, the rest of the second
+    is skipped with a `RuntimeWarning`.
+
+    :param start_time: the oldest time to reach in seconds, None for no bound
+    :param end_time: the newest time to start from in seconds, None for now
+    :param id_key: the field identifying a record
+    :param time_key: the field holding the time of a record
+    :param max_limit: the largest page the endpoint returns, passed to `fetch`
+      as a third argument for the retried second, None when it takes no limit
+    """
+
+    def __init__(
+        self,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        id_key: str = "id",
+        time_key: str = "time",
+        max_limit: Optional[int] = None,
+    ):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.done = False
+        self._id_key = id_key
+        self._time_key = time_key
+        self._max_limit = max_limit
+        self._retrying = False
+        self._page_size = 0
+        self._seen = set()
+
+    def window(self):
+        if self._retrying:
+            return self.start_time, self.end_time, self._max_limit
+        return self.start_time, self.end_time
+
+    def feed(self, page: list) -> list:
+        """
+        :param page: the records returned for the current window
+        :return: the records not yielded before, in page order
+        """
+        if not page:
+            self.done = True
+            return []
+
+        times = [helpers.parse_time(record[self._time_key]) for record in page]
+        records = [record for record in page if record[self._id_key] not in self._seen]
+
+        # times are fractional but the endpoints take whole seconds, so round up
+        # not to miss records of the oldest second which did not fit in the page
+        end_time = math.ceil(min(times))
+        if not records:
+            # the boundary second came back alone; unless the page was as long
+            # as a page gets, that was all of it
+            limit = self._max_limit if self._retrying else self._page_size
+            if len(page) > 1 and len(page) >= limit:
+                if self._max_limit is not None and not self._retrying:
+                    self._retrying = True
+                    return []
+                warnings.warn(
+                    f"more than {len(page)} records at {end_time}, the rest of "
+                    "that second is skipped",
+                    RuntimeWarning,
+                )
+            end_time -= 1
+        if not self._retrying:
+            self._page_size = max(self._page_size, len(page))
+        # keep the larger pages while the retried second is not done with
+        self._retrying = self._retrying and end_time == self.end_time
+        self._seen = {
+            record[self._id_key]
+            for record, time in zip(page, times)
+            if time <= end_time
+        }
+        self.end_time = end_time
+        self.done = self.start_time is not None and end_time < self.start_time
+        return records
+
+
+class Forward:
+    """
+    Walks an endpoint returning the oldest records first, e.g. candles,
+    in consecutive windows of `step` seconds from `start_time` to `end_time`.
+
+    :param start_time: the oldest time in seconds
+    :param end_time: the newest time in seconds, None for now
+    :param step: the width of a window in seconds
+    :param time_key: the field holding the time of a record
+    """
+
+    def __init__(
+        self,
+        start_time: int,
+        end_time: Optional[int],
+        step: int,
+        time_key: str = "time",
+    ):
+        self.start_time = start_time
+        self.end_time = (
+            end_time if end_time is not None else helpers.get_current_timestamp() // 1000
+        )
+        self.step = step
+        self.done = start_time > self.end_time
+        self._time_key = time_key
+        self._last = None
+
+    def window(self):
+        return self.start_time, min(self.start_time + self.step, self.end_time)
+
+    def feed(self, page: list) -> list:
+        records = [
+            record
+            for record in page
+            if self._last is None
+            or helpers.parse_time(record[self._time_key]) > self._last
+        ]
+        if records:
+            self._last = helpers.parse_time(records[-1][self._time_key])
+
+        self.start_time += self.step
+        self.done = self.start_time > self.end_time
+        return records
+
+
+def iterate(fetch: Callable[[int, int], list], cursor) -> Iterator[dict]:
+    """
+    Yield the records of every window of `cursor`, fetching the next page
+    on a worker thread while the current one is consumed.
+
+    :param fetch: called with the (start_time, end_time) of a window
+    :param cursor: a `Backward` or `Forward` cursor
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if cursor.done:
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch, *cursor.window())
+        while future is not None:
+            records = cursor.feed(future.result())
+            future = None if cursor.done else executor.submit(fetch, *cursor.window())
+            yield from records
+
+
+async def aiterate(fetch: Callable, cursor) -> AsyncIterator[dict]:
+    """
+    Async version of `iterate`, `fetch` returns an awaitable.
+    """
+    import asyncio
+
+    if cursor.done:
+        return
+
+    task = asyncio.ensure_future(fetch(*cursor.window()))
+    try:
+        while task is not None:
+            records = cursor.feed(await task)
+            task = (
+                None if cursor.done else asyncio.ensure_future(fetch(*cursor.window()))
+            )
+            for record in records:
+                yield record
+    finally:
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,159 @@
+"""
+Clients for many subaccounts of one account, sharing connections and rate budget
+"""
+import inspect
+from typing import Dict, Iterable, List, Optional
+
+from . import constants
+from .client import Client
+from .exceptions import Invalid
+from .ratelimit import RateLimiter
+from .transport import SessionTransport
+
+
+class SubaccountPool:
+    """
+    One `Client` per subaccount, all sharing a single connection pool and a
+    single rate limiter, since FTX counts the requests of every subaccount
+    against the same account. Each client signs its requests with its own
+    FTX-SUBACCOUNT header.
+
+        with SubaccountPool(key, secret, ["alpha", "beta", None]) as pool:
+            positions = pool.map("get_positions", showAvgPrice=True)
+            positions["alpha"], positions[None]  # None is the main account
+
+    With `client_class=AsyncClient` the pool shares one aiohttp session and
+    `map` has to be awaited.
+
+    :param key: the API key
+    :param secret: the API secret
+    :param subaccounts: the subaccount names, None for the main account
+    :param max_workers: the number of requests `map` keeps in flight
+    :param transport: the transport shared by the clients, defaults to a
+      keep-alive one owned by the pool
+    :param rate_limiter: the limiter shared by the clients, defaults to one
+      owned by the pool
+    :param client_class: `Client` or `AsyncClient`
+    :param client_options: further keyword arguments of every client, e.g.
+      a `retry_policy` or `metrics`
+    """
+
+    def __init__(
+        self,
+        key: str,
+        secret: str,
+        subaccounts: Iterable[Optional[str]],
+        max_workers: int = constants.DEFAULT_BATCH_WORKERS,
+        transport=None,
+        rate_limiter: Optional[RateLimiter] = None,
+        client_class=Client,
+        **client_options,
+    ):
+        if transport is None:
+            transport = self._default_transport(client_class, max_workers)
+        self._transport = transport
+        self._rate_limiter = (
+            rate_limiter if rate_limiter is not None else RateLimiter()
+        )
+        self._max_workers = max_workers
+        self._clients: Dict[Optional[str], Client] = {
+            subaccount: client_class(
+                key,
+                secret,
+                subaccount,
+                transport=transport,
+                rate_limiter=self._rate_limiter,
+                **client_options,
+            )
+            for subaccount in subaccounts
+        }
+        if not self._clients:
+            raise Invalid("a pool needs at least one subaccount")
+
+    @staticmethod
+    def _default_transport(client_class, max_workers: int):
+        if inspect.iscoroutinefunction(client_class.close):
+            from .transport import AiohttpTransport
+
+            return AiohttpTransport()
+        return SessionTransport(
+            pool_maxsize=max(max_workers, constants.DEFAULT_POOL_MAXSIZE)
+        )
+
+    @classmethod
+    def from_account(cls, key: str, secret: str, main: bool = True, **options):
+        """
+        A pool of every subaccount of the account, listed with `get_subaccounts`.
+        Only for blocking clients.
+
+        :param main: include the main account, keyed None
+        """
+        with Client(key, secret) as client:
+            names = [subaccount["nickname"] for subaccount in client.get_subaccounts()]
+        return cls(key, secret, ([None] if main else []) + names, **options)
+
+    @property
+    def subaccounts(self) -> List[Optional[str]]:
+        return list(self._clients)
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self._rate_limiter
+
+    def __getitem__(self, subaccount: Optional[str]) -> Client:
+        return self._clients[subaccount]
+
+    def __iter__(self):
+        return iter(self._clients.items())
+
+    def __len__(self):
+        return len(self._clients)
+
+    def map(
+        self,
+        method: str,
+        *args,
+        subaccounts: Optional[Iterable[Optional[str]]] = None,
+        **kwargs,
+    ):
+        """
+        Call a client method for several subaccounts concurrently
+
+        :param method: the name of the `Client` method, e.g. get_balances
+        :param subaccounts: the subaccounts to call it for, None for all
+        :return: a dict contains the result, or the exception raised,
+          of every subaccount
+        """
+        names = list(self._clients if subaccounts is None else subaccounts)
+        calls = [
+            lambda client=self._clients[name]: getattr(client, method)(*args, **kwargs)
+            for name in names
+        ]
+        # the first client runs the batch the way its class does, threads or tasks
+        client = next(iter(self._clients.values()))
+        return client._then(
+            client._batch(calls, self._max_workers),
+            lambda batch: dict(zip(names, batch.results)),
+        )
+
+    def close(self):
+        return self._transport.close()
+
+    def __enter__(self):
+        if inspect.iscoroutinefunction(self._transport.close):
+            raise TypeError(
+                "a pool of AsyncClient is closed asynchronously, use `async with`"
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # a pool of blocking clients closes right away
+        closed = self.close()
+        if inspect.isawaitable(closed):
+            await closed
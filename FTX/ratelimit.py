@@ -0,0 +1,257 @@
+"""
+Client side rate limiting for the FTX REST API
+"""
+import os
+import struct
+import threading
+from time import monotonic, sleep
+from typing import Dict, Optional, Tuple
+
+from . import constants
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Every
+    request reserves its weight right away, going into debt when the bucket is
+    empty, and then sleeps exactly until its tokens are due. Callers are thus
+    served in arrival order and the long-run throughput never exceeds `rate`.
+
+    With the default capacity of one token requests are spaced `1 / rate`
+    apart, so no one-second window holds more than `rate` of them. A larger
+    capacity lets bursts through at once, and a window may then hold up to
+    `capacity - 1` requests beyond `rate`.
+
+    :param rate: the tokens added per second
+    :param capacity: the largest burst, defaults to 1
+    :param weights: the cost of the endpoints starting with a given prefix,
+      e.g. {"orders": 2}, any other endpoint costs 1
+    """
+
+    def __init__(
+        self,
+        rate: float = constants.RATE_LIMIT_PER_SECOND,
+        capacity: Optional[float] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else 1
+        # longest prefix first so that the most specific weight wins
+        self._weights = sorted(
+            (weights or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self._lock = threading.Lock()
+        self._tokens = self._capacity
+        self._updated = monotonic()
+        self._reserved = 0
+        self._waited = 0.0
+
+    def weight(self, endpoint: str) -> float:
+        """
+        :param endpoint: the endpoint to be requested
+        :return: the tokens the request costs
+        """
+        for prefix, weight in self._weights:
+            if endpoint.startswith(prefix):
+                return weight
+        return 1
+
+    def reserve(self, weight: float = 1) -> float:
+        """
+        Take `weight` tokens from the bucket.
+
+        :param weight: the tokens to take
+        :return: the seconds to wait before the tokens may be used
+        """
+        with self._lock:
+            delay = self._take(weight, monotonic())
+            self._reserved += 1
+            self._waited += delay
+        return delay
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(self._capacity, tokens + (now - updated) * self._rate)
+
+    def _take(self, weight: float, now: float) -> float:
+        tokens = self._refill(self._tokens, self._updated, now) - weight
+        self._tokens = tokens
+        self._updated = now
+        return -tokens / self._rate if tokens < 0 else 0.0
+
+    def _available(self, now: float) -> float:
+        return self._refill(self._tokens, self._updated, now)
+
+    def acquire(self, weight: float = 1) -> float:
+        """
+        Block until `weight` tokens are available.
+
+        :param weight: the tokens to take
+        :return: the seconds spent waiting
+        """
+        delay = self.reserve(weight)
+        if delay:
+            sleep(delay)
+        return delay
+
+    async def acquire_async(self, weight: float = 1) -> float:
+        """
+        Coroutine version of `acquire` which waits without blocking the loop.
+        """
+        delay = self.reserve(weight)
+        if delay:
+            import asyncio
+
+            await asyncio.sleep(delay)
+        return delay
+
+    def state(self) -> dict:
+        """
+        :return: a dict contains the rate, capacity, currently available tokens
+          (negative while requests are queued), requests reserved so far and
+          total seconds they waited
+        """
+        with self._lock:
+            return {
+                "rate": self._rate,
+                "capacity": self._capacity,
+                "tokens": self._available(monotonic()),
+                "requests": self._reserved,
+                "waited": self._waited,
+            }
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    Token bucket whose state lives in a memory-mapped file, so that every
+    process on the host using the same file draws from one budget.
+
+    The bucket is updated in place under an exclusive `flock`, which only
+    covers a few arithmetic operations, and requests are served in the order
+    they reserve across all processes. Every process must use the same
+    `rate` and `capacity`. `state()` reports the shared tokens next to this
+    process' own request and wait counters. POSIX only.
+
+    The file is stamped with `time.monotonic()` and the boot id of the host,
+    and a bucket left by another boot, or stamped later than the clock now
+    reads, starts over full. A process forked from the one which built the
+    limiter reopens the file on first use, since the lock is held per open file.
+
+    :param path: the file holding the bucket, created if missing
+    """
+
+    _STATE = struct.Struct("<dd16s")  # tokens, updated, boot id
+
+    def __init__(
+        self,
+        path: str,
+        rate: float = constants.RATE_LIMIT_PER_SECOND,
+        capacity: Optional[float] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        import fcntl
+
+        super().__init__(rate, capacity, weights)
+        self._flock = fcntl.flock
+        self._lock_ex = fcntl.LOCK_EX
+        self._lock_un = fcntl.LOCK_UN
+        self.path = path
+        self._boot_id = _boot_id()
+        self._pid = None
+        self._open()
+
+    def _open(self):
+        import mmap
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._flock(self._fd, self._lock_ex)
+        try:
+            if os.fstat(self._fd).st_size < self._STATE.size:
+                os.ftruncate(self._fd, self._STATE.size)
+                os.pwrite(
+                    self._fd,
+                    self._STATE.pack(self._capacity, monotonic(), self._boot_id),
+                    0,
+                )
+        finally:
+            self._flock(self._fd, self._lock_un)
+        self._map = mmap.mmap(self._fd, self._STATE.size)
+        self._pid = os.getpid()
+
+    def _reopen(self):
+        # the fd and the map were inherited through fork; leave them to the parent
+        if self._pid != os.getpid():
+            self._open()
+
+    def _read(self, now: float) -> Tuple[float, float]:
+        tokens, updated, boot_id = self._STATE.unpack_from(self._map)
+        if boot_id != self._boot_id or updated > now:
+            # left by another boot, whose monotonic clock means nothing here
+            # and may be far ahead of this one
+            return self._capacity, now
+        return tokens, updated
+
+    @classmethod
+    def for_account(
+        cls,
+        key: str,
+        subaccount: Optional[str] = None,
+        directory: Optional[str] = None,
+        **kwargs,
+    ) -> "SharedRateLimiter":
+        """
+        The limiter shared by all processes of the host trading with
+        the given API key and subaccount.
+
+        :param key: the API key
+        :param subaccount: the subaccount, None for the main account
+        :param directory: where the bucket file lives, defaults to the temp dir
+        """
+        import hashlib
+        import tempfile
+
+        digest = hashlib.sha256(f"{key}\0{subaccount or ''}".encode("utf-8"))
+        path = os.path.join(
+            directory or tempfile.gettempdir(),
+            f"ftx-ratelimit-{digest.hexdigest()[:16]}",
+        )
+        return cls(path, **kwargs)
+
+    def _take(self, weight: float, now: float) -> float:
+        self._reopen()
+        self._flock(self._fd, self._lock_ex)
+        try:
+            # read the clock under the lock, so no process stamps a later time
+            now = monotonic()
+            tokens, updated = self._read(now)
+            tokens = self._refill(tokens, updated, now) - weight
+            self._STATE.pack_into(self._map, 0, tokens, now, self._boot_id)
+        finally:
+            self._flock(self._fd, self._lock_un)
+        return -tokens / self._rate if tokens < 0 else 0.0
+
+    def _available(self, now: float) -> float:
+        self._reopen()
+        self._flock(self._fd, self._lock_ex)
+        try:
+            now = monotonic()
+            tokens, updated = self._read(now)
+        finally:
+            self._flock(self._fd, self._lock_un)
+        return self._refill(tokens, updated, now)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+def _boot_id() -> bytes:
+    """
+    :return: an id of the current boot of the host, zeros where unknown
+    """
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return bytes.fromhex(f.read().strip().replace("-", ""))
+    except (OSError, ValueError):
+        return bytes(16)
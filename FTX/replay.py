@@ -0,0 +1,256 @@
+"""
+Recording of client traffic to a log file, and its replay offline
+"""
+import asyncio
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import defaultdict
+from time import perf_counter, sleep, time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .transport import AsyncTransport, Response, Transport
+
+MAGIC = b"FTXR\x01"
+# flags, status, key length, content length, start time, elapsed seconds
+RECORD = struct.Struct("<BHIIdd")
+COMPRESSED = 1
+
+
+def request_key(method: str, url: str, body: Optional[bytes] = None) -> bytes:
+    """
+    :return: the request identity, independent of the host, the signature and
+      the order of the query parameters
+    """
+    parts = urlsplit(url)
+    endpoint = parts.path.partition("/api/")[2] or parts.path.lstrip("/")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method} {endpoint}?{query}".encode("utf-8")
+    return key + b"\n" + body if body else key
+
+
+class Recorder:
+    """
+    Append requests and their responses to a log file, one record each:
+    a fixed-size header, the request key and the (optionally compressed)
+    response body.
+
+    :param path: the log file, created or appended to
+    :param compress: zlib-compress the response bodies
+    """
+
+    def __init__(self, path: str, compress: bool = True):
+        self._compress = compress
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(
+        self, key: bytes, response: Response, started: float, elapsed: float
+    ):
+        content, flags = response.content, 0
+        if self._compress:
+            content, flags = zlib.compress(content), COMPRESSED
+        header = RECORD.pack(
+            flags, response.status, len(key), len(content), started, elapsed
+        )
+        with self._lock:
+            self._file.write(header + key + content)
+            # whole records reach the file as they are made, so a recording
+            # killed midway leaves at most the last one incomplete
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Log:
+    """
+    Read access to a log file. Opening it scans the record headers only,
+    seeking over the bodies, to index the offsets of every request key;
+    bodies are then read one at a time as they are replayed, so the log
+    may be far larger than memory.
+
+    Every key replays its responses in the recorded order, and then keeps
+    returning the last one. An incomplete record at the end of the file, left
+    by a recording which was killed, is ignored.
+
+    :param path: the log file
+    """
+
+    def __init__(self, path: str):
+        self._fd = os.open(path, os.O_RDONLY)
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, List[Tuple[int, int, int, int, float]]] = (
+            defaultdict(list)
+        )
+        self._next: Dict[bytes, int] = defaultdict(int)
+        self._scan()
+
+    def _scan(self):
+        end = os.fstat(self._fd).st_size
+        with open(self._fd, "rb", closefd=False) as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a recorded FTX log")
+            offset = len(MAGIC)
+            while True:
+                header = file.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    break
+                flags, status, key_size, size, _, elapsed = RECORD.unpack(header)
+                key = file.read(key_size)
+                offset += RECORD.size + key_size
+                # the tail of a recording which was not closed cleanly
+                if len(key) < key_size or offset + size > end:
+                    break
+                self._index[key].append((offset, size, flags, status, elapsed))
+                offset += size
+                file.seek(offset)
+
+    def __len__(self):
+        return sum(map(len, self._index.values()))
+
+    def keys(self):
+        return self._index.keys()
+
+    def lookup(self, key: bytes) -> Optional[Tuple[Response, float]]:
+        """
+        :return: the next recorded response to the request and the seconds
+          it took, None if it was not recorded
+        """
+        records = self._index.get(key)
+        if not records:
+            return None
+        with self._lock:
+            position = self._next[key]
+            self._next[key] = min(position + 1, len(records) - 1)
+        offset, size, flags, status, elapsed = records[position]
+        content = os.pread(self._fd, size, offset)
+        if flags & COMPRESSED:
+            content = zlib.decompress(content)
+        return Response(status, {}, content), elapsed
+
+    def rewind(self):
+        with self._lock:
+            self._next.clear()
+
+    def close(self):
+        os.close(self._fd)
+
+
+def _missing(key: bytes) -> Response:
+    error = f"Not recorded: {key.decode('utf-8', 'replace')}"
+    return Response(404, {}, json.dumps({"success": False, "error": error}).encode())
+
+
+class RecordingTransport(Transport):
+    """
+    Send requests through `transport` and record them to `path`.
+
+        transport = RecordingTransport(SessionTransport(), "run.log")
+        client = Client(key, secret, transport=transport)
+
+    :param transport: the transport really sending the requests
+    :param path: the log file
+    :param compress: zlib-compress the response bodies
+    """
+
+    def __init__(self, transport: Transport, path: str, compress: bool = True):
+        self._transport = transport
+        self._recorder = Recorder(path, compress)
+
+    def request(self, method, url, headers, body=None, timeout=None) -> Response:
+        started, start = time(), perf_counter()
+        response = self._transport.request(method, url, headers, body, timeout)
+        self._recorder.write(
+            request_key(method, url, body), response, started, perf_counter() - start
+        )
+        return response
+
+    def close(self):
+        self._transport.close()
+        self._recorder.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Answer requests from a log recorded by `RecordingTransport`, without any
+    network. Requests which were not recorded get a 404 error response.
+
+        client = Client(key, secret, transport=ReplayTransport("run.log", speed=1))
+
+    :param path: the log file
+    :param speed: replay the recorded latencies divided by `speed`,
+      None to answer as fast as possible
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None):
+        self.log = Log(path)
+        self._speed = speed
+
+    def request(self, method, url, headers, body=None, timeout=None) -> Response:
+        key = request_key(method, url, body)
+        found = self.log.lookup(key)
+        if found is None:
+            return _missing(key)
+        response, elapsed = found
+        if self._speed:
+            sleep(elapsed / self._speed)
+        return response
+
+    def close(self):
+        self.log.close()
+
+
+class AsyncRecordingTransport(AsyncTransport):
+    """
+    Coroutine version of `RecordingTransport`.
+    """
+
+    def __init__(self, transport: AsyncTransport, path: str, compress: bool = True):
+        self._transport = transport
+        self._recorder = Recorder(path, compress)
+
+    async def request(
+        self, method, url, headers, body=None, timeout=None
+    ) -> Response:
+        started, start = time(), perf_counter()
+        response = await self._transport.request(method, url, headers, body, timeout)
+        self._recorder.write(
+            request_key(method, url, body), response, started, perf_counter() - start
+        )
+        return response
+
+    async def close(self):
+        await self._transport.close()
+        self._recorder.close()
+
+
+class AsyncReplayTransport(AsyncTransport):
+    """
+    Coroutine version of `ReplayTransport`.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None):
+        self.log = Log(path)
+        self._speed = speed
+
+    async def request(
+        self, method, url, headers, body=None, timeout=None
+    ) -> Response:
+        key = request_key(method, url, body)
+        found = self.log.lookup(key)
+        if found is None:
+            return _missing(key)
+        response, elapsed = found
+        if self._speed:
+            await asyncio.sleep(elapsed / self._speed)
+        return response
+
+    async def close(self):
+        self.log.close()
@@ -0,0 +1,324 @@
+"""
+Retries with backoff and hedged requests, see `Client(retry_policy=..., hedge=...)`
+"""
+import heapq
+import itertools
+import random
+import threading
+from collections import defaultdict, deque
+from time import perf_counter, sleep
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from . import constants
+from .exceptions import FTXError, Invalid, NetworkError, RateLimitExceeded, ServerError
+from .metrics import endpoint_label
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def _by_prefix(values: Optional[Dict[str, float]]):
+    # longest prefix first so that the most specific entry wins
+    return sorted((values or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+
+class RetryPolicy:
+    """
+    Retry failed requests with exponential backoff and full jitter.
+
+    Idempotent requests are retried on rate-limit, server and network errors,
+    the others only when the rate limit refused them, since they were not
+    executed then. A `Retry-After` sent with a rate-limit error is waited
+    instead of the backoff.
+
+    :param attempts: the attempts per request, including the first one, at least 1
+    :param backoff: the largest delay in seconds before the first retry,
+      doubled for every further one
+    :param max_backoff: the largest delay in seconds
+    :param endpoint_attempts: the attempts for the endpoints starting with a
+      given prefix, e.g. {"orders": 1} to never retry orders
+    :param idempotent: the methods safe to send again
+    :param retry_on: the errors worth retrying
+    """
+
+    def __init__(
+        self,
+        attempts: int = constants.DEFAULT_RETRY_ATTEMPTS,
+        backoff: float = constants.DEFAULT_RETRY_BACKOFF,
+        max_backoff: float = constants.DEFAULT_RETRY_MAX_BACKOFF,
+        endpoint_attempts: Optional[Dict[str, int]] = None,
+        idempotent: Iterable[str] = ("GET",),
+        retry_on: Tuple[Type[FTXError], ...] = (
+            RateLimitExceeded,
+            ServerError,
+            NetworkError,
+        ),
+    ):
+        for prefix, count in [("", attempts), *(endpoint_attempts or {}).items()]:
+            if count < 1:
+                raise Invalid(
+                    f"attempts must be at least 1, got {count}"
+                    + (f" for {prefix!r}" if prefix else "")
+                )
+        self._attempts = attempts
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._endpoint_attempts = _by_prefix(endpoint_attempts)
+        self._idempotent = frozenset(idempotent)
+        self._retry_on = retry_on
+
+    def attempts(self, endpoint: str) -> int:
+        for prefix, attempts in self._endpoint_attempts:
+            if endpoint.startswith(prefix):
+                return attempts
+        return self._attempts
+
+    def retries(self, method: str, error: Exception) -> bool:
+        if not isinstance(error, self._retry_on):
+            return False
+        return method in self._idempotent or isinstance(error, RateLimitExceeded)
+
+    def delay(self, retry: int, error: Exception) -> float:
+        """
+        :param retry: the number of the retry, from 0
+        :param error: the error of the previous attempt
+        :return: the seconds to wait before the retry
+        """
+        if isinstance(error, RateLimitExceeded) and error.retry_after is not None:
+            return error.retry_after
+        return random.uniform(0, min(self._max_backoff, self._backoff * 2 ** retry))
+
+    def run(self, method: str, endpoint: str, call: Callable):
+        """
+        :return: the result of the first successful `call`
+        """
+        attempts = self.attempts(endpoint)
+        for retry in range(attempts):
+            try:
+                return call()
+            except FTXError as error:
+                if retry + 1 >= attempts or not self.retries(method, error):
+                    raise
+                sleep(self.delay(retry, error))
+
+    async def run_async(
+        self, method: str, endpoint: str, call: Callable[[], Awaitable]
+    ):
+        attempts = self.attempts(endpoint)
+        for retry in range(attempts):
+            try:
+                return await call()
+            except FTXError as error:
+                if retry + 1 >= attempts or not self.retries(method, error):
+                    raise
+                import asyncio
+
+                await asyncio.sleep(self.delay(retry, error))
+
+
+class _Pending:
+    """The hedge of one request, sent at its deadline unless cancelled first."""
+
+    __slots__ = ("call", "future", "done")
+
+    def __init__(self, call: Callable):
+        self.call = call
+        self.future: Optional["Future"] = None
+        self.done = False
+
+
+class Hedge:
+    """
+    Send a second, identical GET when the first one is slower than the given
+    percentile of the recent latencies of its endpoint. Both requests go
+    through the rate limiter.
+
+    A `Client` sends the first request from the calling thread, so it never
+    queues behind other requests, and a timer started with it sends the hedge
+    from a pool thread. The calling thread cannot leave its own request early,
+    so it returns the answer of the hedge when that came back first or when
+    its own request failed. An `AsyncClient` returns whichever answers first.
+
+    :param percentile: the latency percentile after which to hedge
+    :param endpoints: hedge only the endpoints starting with these prefixes,
+      None for every GET
+    :param samples: the recent latencies kept per endpoint
+    :param min_samples: the latencies to observe before hedging an endpoint
+    :param max_workers: the threads sending the hedges of a `Client`
+    """
+
+    def __init__(
+        self,
+        percentile: float = constants.DEFAULT_HEDGE_PERCENTILE,
+        endpoints: Optional[Iterable[str]] = None,
+        samples: int = constants.DEFAULT_HEDGE_SAMPLES,
+        min_samples: int = constants.DEFAULT_HEDGE_MIN_SAMPLES,
+        max_workers: int = 16,
+    ):
+        self._percentile = percentile
+        self._endpoints = None if endpoints is None else tuple(endpoints)
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=samples)
+        )
+        self._max_workers = max_workers
+        self._executor: Optional["ThreadPoolExecutor"] = None
+        # the hedges to send, as (deadline, sequence, pending), earliest first
+        self._timer = threading.Condition()
+        self._due: list = []
+        self._sequence = itertools.count()
+        # the number of hedged requests sent, and of those answering first
+        self.sent = 0
+        self.won = 0
+
+    def applies(self, method: str, endpoint: str) -> bool:
+        return method == "GET" and (
+            self._endpoints is None or endpoint.startswith(self._endpoints)
+        )
+
+    def threshold(self, endpoint: str) -> Optional[float]:
+        """
+        :return: the seconds to wait before hedging, None while too few
+          latencies of the endpoint are known
+        """
+        with self._lock:
+            latencies = sorted(self._latencies[endpoint_label(endpoint)])
+        if len(latencies) < self._min_samples:
+            return None
+        index = int(len(latencies) * self._percentile / 100)
+        return latencies[min(len(latencies) - 1, index)]
+
+    def _observe(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._latencies[endpoint_label(endpoint)].append(seconds)
+
+    def _count(self, won: bool = False):
+        with self._lock:
+            if won:
+                self.won += 1
+            else:
+                self.sent += 1
+
+    def _schedule(self, deadline: float, call: Callable) -> _Pending:
+        pending = _Pending(call)
+        with self._timer:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="hedge"
+                )
+                threading.Thread(
+                    target=self._send_due,
+                    args=(self._executor,),
+                    name="hedge-timer",
+                    daemon=True,
+                ).start()
+            heapq.heappush(self._due, (deadline, next(self._sequence), pending))
+            self._timer.notify()
+        return pending
+
+    def _cancel(self, pending: _Pending) -> Optional["Future"]:
+        """
+        :return: the hedge, None when it was not sent
+        """
+        with self._timer:
+            pending.done = True
+            return pending.future
+
+    def _send_due(self, executor: "ThreadPoolExecutor"):
+        with self._timer:
+            # until `close` replaces the executor
+            while self._executor is executor:
+                now = perf_counter()
+                while self._due and self._due[0][0] <= now:
+                    pending = heapq.heappop(self._due)[2]
+                    if not pending.done:
+                        pending.done = True
+                        pending.future = executor.submit(pending.call)
+                        self._count()
+                self._timer.wait(self._due[0][0] - now if self._due else None)
+
+    def run(self, endpoint: str, call: Callable):
+        """
+        :return: the result of the first request, or of the hedge when it
+          answered first or the first request failed
+        """
+        start = perf_counter()
+        threshold = self.threshold(endpoint)
+        if threshold is None:
+            result = call()
+            self._observe(endpoint, perf_counter() - start)
+            return result
+
+        pending = self._schedule(start + threshold, call)
+        try:
+            result = call()
+        except Exception:
+            hedged = self._cancel(pending)
+            if hedged is None or hedged.exception() is not None:
+                raise
+            self._count(won=True)
+            return hedged.result()
+        self._observe(endpoint, perf_counter() - start)
+
+        hedged = self._cancel(pending)
+        if hedged is not None and hedged.done() and hedged.exception() is None:
+            self._count(won=True)
+            return hedged.result()
+        return result
+
+    async def run_async(self, endpoint: str, call: Callable[[], Awaitable]):
+        start = perf_counter()
+        threshold = self.threshold(endpoint)
+        if threshold is None:
+            result = await call()
+            self._observe(endpoint, perf_counter() - start)
+            return result
+
+        import asyncio
+
+        first = asyncio.ensure_future(call())
+        done, _ = await asyncio.wait({first}, timeout=threshold)
+        if done:
+            self._observe(endpoint, perf_counter() - start)
+            return first.result()
+
+        self._count()
+        hedged = asyncio.ensure_future(call())
+        pending, error = {first, hedged}, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            self._count(won=True)
+                        self._observe(endpoint, perf_counter() - start)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self):
+        with self._timer:
+            executor, self._executor = self._executor, None
+            self._due.clear()
+            self._timer.notify()
+        if executor is not None:
+            executor.shutdown(wait=False)
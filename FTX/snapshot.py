@@ -0,0 +1,173 @@
+"""
+Indexed snapshots of account state
+"""
+import threading
+from time import time
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, List, Optional
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class Snapshot:
+    """
+    The result of an endpoint fetched once and indexed for O(1) lookups
+    without further requests, e.g. balances by coin:
+
+        >>> balances = client.balance_snapshot(interval=5)
+        >>> balances["USD"]["free"], balances.age
+        (1520.3, 0.8)
+
+    It changes only on `refresh` or, once `start`ed, every `interval`
+    seconds in the background; `fetched_at` and `age` tell how stale it is.
+
+    :param fetch: returns the records, or an awaitable of them for `refresh_async`
+    :param index: builds the lookup dict from the records
+    """
+
+    def __init__(self, fetch: Callable, index: Callable[..., Dict[Hashable, dict]]):
+        self._fetch = fetch
+        self._make_index = index
+        self._index: Dict[Hashable, dict] = {}
+        self._stopped = threading.Event()
+        self.records = None
+        self.fetched_at: Optional[float] = None
+        # the run_async task when an AsyncClient started one
+        self.task: Optional["asyncio.Task"] = None
+
+    def load(self, records):
+        index = self._make_index(records)
+        # rebinding keeps concurrent readers on a consistent index
+        self.records, self._index, self.fetched_at = records, index, time()
+
+    def refresh(self) -> "Snapshot":
+        self.load(self._fetch())
+        return self
+
+    async def refresh_async(self) -> "Snapshot":
+        self.load(await self._fetch())
+        return self
+
+    def start(self, interval: float):
+        """
+        Refresh every `interval` seconds on a daemon thread until `stop`.
+        """
+        self._stopped.clear()
+
+        def run():
+            while not self._stopped.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    # keep the last good state, `age` exposes the failure
+                    pass
+
+        threading.Thread(target=run, daemon=True).start()
+
+    async def run_async(self, interval: float):
+        """
+        Coroutine refreshing every `interval` seconds until `stop`.
+        """
+        import asyncio
+
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_async()
+            except Exception:
+                pass
+
+    def stop(self):
+        self._stopped.set()
+
+    @property
+    def age(self) -> Optional[float]:
+        """
+        :return: the seconds since the last fetch
+        """
+        return None if self.fetched_at is None else time() - self.fetched_at
+
+    def __getitem__(self, key: Hashable) -> dict:
+        return self._index[key]
+
+    def get(self, key: Hashable, default=None):
+        return self._index.get(key, default)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index)
+
+
+class PortfolioSnapshot:
+    """
+    The account, positions, balances, open orders and open trigger orders,
+    fetched concurrently by `Client.get_portfolio_snapshot` and indexed:
+
+        >>> portfolio = client.get_portfolio_snapshot()
+        >>> portfolio.positions["BTC-PERP"]["netSize"]
+        0.5
+        >>> portfolio.balances["USD"]["free"]
+        1520.3
+        >>> portfolio.orders["BTC-PERP"], portfolio.skew
+        ([...], 0.004)
+
+    The parts are answered at slightly different moments: `received_at`
+    holds the time each one arrived and `skew` the spread between them.
+
+    :param started: the time the requests were sent
+    :param parts: the (result, received time) of every part, by name
+    """
+
+    PARTS = ("account", "positions", "balances", "orders", "trigger_orders")
+
+    def __init__(self, started: float, parts: Dict[str, tuple]):
+        self.account: dict = parts["account"][0]
+        self.positions: Dict[str, dict] = {
+            position["future"]: position for position in parts["positions"][0]
+        }
+        self.balances: Dict[str, dict] = {
+            balance["coin"]: balance for balance in parts["balances"][0]
+        }
+        self.orders: Dict[str, List[dict]] = _group(parts["orders"][0])
+        self.trigger_orders: Dict[str, List[dict]] = _group(
+            parts["trigger_orders"][0]
+        )
+        self.received_at: Dict[str, float] = {
+            name: received for name, (_, received) in parts.items()
+        }
+        self.started = started
+        self.fetched_at = max(self.received_at.values())
+        self.skew = self.fetched_at - min(self.received_at.values())
+        self.elapsed = self.fetched_at - started
+
+    @classmethod
+    def assemble(cls, started: float, results: Dict[str, object]):
+        """
+        :param results: the (result, received time) of every part, or the
+          exception it raised
+        :raise: the first exception, so that no partial snapshot is returned
+        """
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+        return cls(started, results)
+
+    @property
+    def age(self) -> float:
+        """
+        :return: the seconds since the last part arrived
+        """
+        return time() - self.fetched_at
+
+
+def _group(orders) -> Dict[str, List[dict]]:
+    by_market: Dict[str, List[dict]] = {}
+    for order in orders:
+        by_market.setdefault(order["market"], []).append(order)
+    return by_market
@@ -0,0 +1,165 @@
+"""
+HTTP transports used by the client to talk to the FTX REST API
+"""
+import threading
+from typing import Mapping, NamedTuple, Optional
+
+from . import constants
+
+
+class Response(NamedTuple):
+    status: int
+    headers: Mapping[str, str]
+    content: bytes
+
+
+class Transport:
+    """
+    Interface of a blocking HTTP transport.
+
+    Subclass it and implement `request` to plug another HTTP stack into `Client`.
+    """
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        """
+        :param method: the HTTP method, GET, POST or DELETE
+        :param url: the full url including the query string
+        :param headers: the request headers
+        :param body: the encoded request body
+        :param timeout: the timeout in seconds
+        :return: the status, headers and raw body of the response
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SessionTransport(Transport):
+    """
+    Keep-alive transport backed by a connection-pooled `requests.Session`,
+    so consecutive requests reuse warm TCP/TLS connections.
+
+    :param pool_connections: the number of per-host pools to keep
+    :param pool_maxsize: the maximum number of connections kept alive per host
+    :param pool_block: block instead of opening extra connections
+      once `pool_maxsize` connections to a host are in use
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = constants.DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = constants.DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+    ):
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        # requests takes longer to import than most scripts take to run a
+        # request, so it is imported along with the session on first use
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    adapter = HTTPAdapter(
+                        pool_connections=self._pool_connections,
+                        pool_maxsize=self._pool_maxsize,
+                        pool_block=self._pool_block,
+                    )
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def request(self, method, url, headers, body=None, timeout=None) -> Response:
+        response = self._get_session().request(
+            method, url, headers=headers, data=body, timeout=timeout
+        )
+        return Response(response.status_code, response.headers, response.content)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class AsyncTransport:
+    """
+    Interface of an asyncio HTTP transport, see `Transport`.
+    """
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    Transport backed by a single `aiohttp.ClientSession`, so every coroutine
+    on the event loop shares one keep-alive connection pool.
+    Requires the optional `aiohttp` package.
+
+    :param limit: the maximum number of simultaneous connections
+    :param limit_per_host: the maximum number of simultaneous connections
+      per host, 0 for no limit
+    """
+
+    def __init__(
+        self, limit: int = constants.DEFAULT_ASYNC_POOL_LIMIT, limit_per_host: int = 0
+    ):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._session = None
+
+    def _get_session(self):
+        # the session binds to the running loop, so it is created on first use
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._limit, limit_per_host=self._limit_per_host
+                )
+            )
+        return self._session
+
+    async def request(self, method, url, headers, body=None, timeout=None) -> Response:
+        import aiohttp
+
+        async with self._get_session().request(
+            method,
+            url,
+            headers=headers,
+            data=body,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            return Response(response.status, response.headers, await response.read())
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,206 @@
+"""
+Streaming client for the FTX websocket API.
+Requires the optional `aiohttp` package.
+"""
+import asyncio
+import hmac
+import inspect
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+from . import constants
+from . import helpers
+from .codec import Codec, get_codec
+from .exceptions import Invalid
+from .orderbook import OrderBook
+
+
+class WebsocketClient:
+    """
+    Subscribe to the orderbook, trades, ticker, fills and orders channels and
+    dispatch every update to the callbacks registered with `on`. Order books
+    are maintained locally in `books`, their checksum verified on every update
+    and resynced when it does not match.
+
+        ws = WebsocketClient(key, secret, rest=AsyncClient(key, secret))
+        ws.on("orderbook", lambda market, book: print(market, book.spread()))
+        ws.on("fills", handle_fill)
+        await ws.subscribe("orderbook", "BTC-PERP")
+        await ws.subscribe("fills")
+        await ws.run()
+
+    :param key: the API key, needed for the private channels
+    :param secret: the API secret
+    :param subaccount: the subaccount to log into, None for the main account
+    :param url: the websocket endpoint, e.g. a local stand-in server
+    :param rest: a `Client` or `AsyncClient` to fetch order book snapshots
+      from on a checksum mismatch; without it the channel is resubscribed
+    :param codec: the JSON codec, defaults to the fastest one installed
+    """
+
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        secret: Optional[str] = None,
+        subaccount: Optional[str] = None,
+        url: str = constants.WEBSOCKET_URL,
+        rest=None,
+        codec: Optional[Codec] = None,
+    ):
+        self._api_key = key
+        self._api_secret = secret
+        self._api_subaccount = subaccount
+        self._url = url
+        self._rest = rest
+        self._codec = codec if codec is not None else get_codec()
+        self._callbacks = defaultdict(list)
+        self._subscriptions = []
+        self._ws = None
+        self._session = None
+        self.books: Dict[str, OrderBook] = {}
+        self.resyncs: Dict[str, int] = defaultdict(int)
+
+    def on(self, channel: str, callback: Callable):
+        """
+        :param channel: orderbook, trades, ticker, fills, orders or error
+        :param callback: called with (market, data), or with (market, OrderBook)
+          for the orderbook channel; coroutine functions are awaited
+        """
+        self._callbacks[channel].append(callback)
+
+    async def _send(self, message: dict):
+        await self._ws.send_str(self._codec.dumps(message).decode("utf-8"))
+
+    async def subscribe(self, channel: str, market: Optional[str] = None):
+        """
+        :param channel: the channel to subscribe
+        :param market: the trading pair, not needed for fills and orders
+        """
+        subscription = helpers.build_query(channel=channel, market=market)
+        self._subscriptions.append(subscription)
+        if self._ws is not None:
+            await self._send({"op": "subscribe", **subscription})
+
+    async def unsubscribe(self, channel: str, market: Optional[str] = None):
+        subscription = helpers.build_query(channel=channel, market=market)
+        self._subscriptions.remove(subscription)
+        if channel == "orderbook":
+            self.books.pop(market, None)
+        if self._ws is not None:
+            await self._send({"op": "unsubscribe", **subscription})
+
+    async def connect(self):
+        import aiohttp
+
+        self._session = aiohttp.ClientSession()
+        self._ws = await self._session.ws_connect(self._url)
+
+        if self._api_key:
+            ts = helpers.get_current_timestamp()
+            sign = hmac.new(
+                self._api_secret.encode("utf-8"),
+                f"{ts}websocket_login".encode("utf-8"),
+                "sha256",
+            ).hexdigest()
+            await self._send(
+                {
+                    "op": "login",
+                    "args": helpers.build_query(
+                        key=self._api_key,
+                        sign=sign,
+                        time=ts,
+                        subaccount=self._api_subaccount,
+                    ),
+                }
+            )
+        elif any(
+            sub["channel"] in constants.PRIVATE_CHANNELS for sub in self._subscriptions
+        ):
+            raise Invalid("the fills and orders channels need a key and secret")
+
+        for subscription in self._subscriptions:
+            await self._send({"op": "subscribe", **subscription})
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def run(self):
+        """
+        Connect, unless already connected, and dispatch messages until
+        the connection closes.
+        """
+        import aiohttp
+
+        if self._ws is None:
+            await self.connect()
+
+        ping = asyncio.ensure_future(self._ping())
+        try:
+            async for message in self._ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                await self._dispatch(self._codec.loads(message.data))
+        finally:
+            ping.cancel()
+            await self.close()
+
+    async def _ping(self):
+        while True:
+            await asyncio.sleep(constants.WEBSOCKET_PING_INTERVAL)
+            await self._send({"op": "ping"})
+
+    async def _dispatch(self, message: dict):
+        channel, market = message.get("channel"), message.get("market")
+        kind = message.get("type")
+
+        if kind == "error":
+            await self._emit("error", market, message)
+            return
+        if kind not in ("partial", "update"):
+            return
+
+        data = message["data"]
+        if channel == "orderbook":
+            book = self.books.get(market)
+            if kind == "partial" or book is None:
+                book = self.books[market] = OrderBook(data)
+            else:
+                book.update(data)
+
+            if book.checksum() != data["checksum"] and not await self._resync(market):
+                # wait for the fresh partial rather than publishing a corrupt book
+                return
+            data = book
+
+        await self._emit(channel, market, data)
+
+    async def _emit(self, channel: str, market: Optional[str], data):
+        for callback in self._callbacks[channel]:
+            result = callback(market, data)
+            if inspect.isawaitable(result):
+                await result
+
+    async def _resync(self, market: str) -> bool:
+        """
+        :return: whether the book was restored right away
+        """
+        self.resyncs[market] += 1
+        if self._rest is None:
+            # the exchange answers a new subscription with a fresh partial
+            for op in ("unsubscribe", "subscribe"):
+                await self._send({"op": op, "channel": "orderbook", "market": market})
+            return False
+
+        if asyncio.iscoroutinefunction(self._rest.get_orderbook):
+            snapshot = await self._rest.get_orderbook(market, 100)
+        else:
+            snapshot = await asyncio.get_running_loop().run_in_executor(
+                None, self._rest.get_orderbook, market, 100
+            )
+        self.books[market].reset(snapshot)
+        return True
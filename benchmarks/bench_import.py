@@ -0,0 +1,82 @@
+"""
+Startup cost of the package, measured with `python -X importtime` in a fresh
+interpreter per run so that no module is already loaded.
+
+    $ python -m benchmarks.bench_import [--runs 10] [--top 15]
+
+Each case reports the median time spent importing the modules it loads beyond
+those of a bare interpreter, how many there are and whether the heavy
+optional ones, requests and asyncio, were among them.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+CASES = (
+    ("import FTX", "import FTX"),
+    ("import client", "from FTX.client import Client"),
+    (
+        "sign one request",
+        "from FTX import Client\n"
+        "Client('key', 'secret')._prepare_request('GET', 'account', {})",
+    ),
+    ("import async", "from FTX.async_client import AsyncClient"),
+)
+HEAVY = ("requests", "asyncio")
+
+# import time: self [us] | cumulative | imported package
+LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \| ( *)(\S+)")
+
+
+def importtime(statement: str) -> Dict[str, int]:
+    """
+    :return: the microseconds spent importing each module, its own code only
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    return {
+        match.group(3): int(match.group(1))
+        for match in map(LINE.match, stderr.splitlines())
+        if match
+    }
+
+
+def measure(statement: str, baseline: set, runs: int) -> Tuple[float, List[str], dict]:
+    totals, modules = [], {}
+    for _ in range(runs):
+        modules = {
+            name: us
+            for name, us in importtime(statement).items()
+            if name not in baseline
+        }
+        totals.append(sum(modules.values()))
+    return statistics.median(totals) / 1e3, sorted(modules), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="interpreters per case")
+    parser.add_argument(
+        "--top", type=int, default=0, help="list the slowest modules of each case"
+    )
+    args = parser.parse_args()
+
+    baseline = set(importtime("pass"))
+    print(f"{'case':<18} {'ms':>8} {'modules':>8}  heavy")
+    for case, statement in CASES:
+        ms, names, modules = measure(statement, baseline, args.runs)
+        heavy = [name for name in HEAVY if name in names]
+        print(f"{case:<18} {ms:>8.2f} {len(names):>8}  {', '.join(heavy) or '-'}")
+        for name in sorted(modules, key=modules.get, reverse=True)[:args.top]:
+            print(f"{'':<4}{name:<40} {modules[name] / 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
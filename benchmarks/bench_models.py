@@ -0,0 +1,72 @@
+"""
+Memory held by fills kept as decoded dicts against `models.Fill`, measured
+with tracemalloc and scaled to one million fills.
+
+    $ python -m benchmarks.bench_models [fills]
+"""
+import gc
+import sys
+import tracemalloc
+
+from FTX.codec import get_codec
+from FTX.models import Fill
+
+
+def payload(n: int) -> bytes:
+    fills = [
+        {
+            "id": 1_000_000 + i,
+            "market": "BTC-PERP",
+            "future": "BTC-PERP",
+            "baseCurrency": None,
+            "quoteCurrency": None,
+            "type": "order",
+            "side": "buy" if i % 2 else "sell",
+            "price": 9000.5 + i % 100,
+            "size": 0.0123,
+            "orderId": 50_000_000 + i // 3,
+            "tradeId": 70_000_000 + i,
+            "time": "2021-01-01T00:00:%02d.123456+00:00" % (i % 60),
+            "fee": 0.0001 * i,
+            "feeRate": 0.0007,
+            "feeCurrency": "USD",
+            "liquidity": "taker",
+        }
+        for i in range(n)
+    ]
+    return get_codec().dumps({"success": True, "result": fills})
+
+
+def held(build, data: bytes) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build(data)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def as_dicts(data: bytes) -> list:
+    return get_codec().loads(data)["result"]
+
+
+def as_models(data: bytes) -> list:
+    return list(Fill.wrap(get_codec().loads(data)["result"]))
+
+
+def main(n: int = 200_000):
+    data = payload(n)
+    scale = 1_000_000 / n
+    sizes = {
+        name: held(build, data)
+        for name, build in (("dict", as_dicts), ("Fill", as_models))
+    }
+    for name, size in sizes.items():
+        print(f"{name:>5}: {size * scale / 2 ** 20:8.1f} MiB per 1M fills")
+    print(f"saved {1 - sizes['Fill'] / sizes['dict']:.0%} with {get_codec().name}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,124 @@
+"""
+Per-request CPU cost of preparing the url, headers and body of a request,
+with the pre-keyed HMAC and precomputed headers against the former code path.
+
+    $ python -m benchmarks.bench_signing [iterations]
+"""
+import hashlib
+import hmac
+import json
+import sys
+import urllib
+from time import process_time
+from urllib.parse import urlencode
+
+from FTX import constants, helpers
+from FTX.client import Client
+
+
+class LegacyClient(Client):
+    """The request preparation as it was before the fast path."""
+
+    def _build_headers(self, scope, method, endpoint, query):
+        endpoint = f"/api/{endpoint}"
+
+        headers = {
+            "Accept": "application/json",
+            "User-Agent": "FTX-Trader/1.0",
+        }
+
+        if scope.lower() == "private":
+            nonce = str(helpers.get_current_timestamp())
+            payload = f"{nonce}{method.upper()}{endpoint}"
+            if method == "GET" and query:
+                payload += "?" + urlencode(query)
+            elif query:
+                payload += json.dumps(query)
+            sign = hmac.new(
+                bytes(self._api_secret, "utf-8"),
+                bytes(payload, "utf-8"),
+                hashlib.sha256,
+            ).hexdigest()
+
+            headers.update(
+                {
+                    "Content-Type": "application/json",
+                    "FTX-KEY": self._api_key,
+                    "FTX-SIGN": sign,
+                    "FTX-TS": nonce,
+                }
+            )
+
+            if self._api_subaccount:
+                headers.update(
+                    {"FTX-SUBACCOUNT": urllib.parse.quote(self._api_subaccount)}
+                )
+
+        return headers
+
+    def _build_url(self, scope, method, endpoint, query):
+        if scope.lower() == "private":
+            url = f"{constants.PRIVATE_API_URL}/{endpoint}"
+        else:
+            url = f"{constants.PUBLIC_API_URL}/{endpoint}"
+
+        if method == "GET":
+            return f"{url}?{urlencode(query, True, '/[]')}" if len(query) > 0 else url
+        else:
+            return url
+
+    def _scope(self, endpoint):
+        if any(endpoint.startswith(substr) for substr in constants.PRIVATE_ENDPOINTS):
+            return "private"
+        return "public"
+
+    def _prepare_request(self, method, endpoint, query):
+        scope = self._scope(endpoint)
+        headers = self._build_headers(scope, method, endpoint, query)
+        url = self._build_url(scope, method, endpoint, query)
+        body = None if method == "GET" else json.dumps(query).encode("utf-8")
+        return url, headers, body
+
+
+CASES = (
+    ("public GET", "GET", "markets/BTC-PERP/orderbook", {"depth": 20}),
+    ("private GET", "GET", "fills", {"market": "BTC-PERP", "limit": 100}),
+    (
+        "private POST",
+        "POST",
+        "orders",
+        {"market": "BTC-PERP", "side": "buy", "price": 9000.5, "type": "limit",
+         "size": 0.01, "reduceOnly": False, "ioc": False, "postOnly": True},
+    ),
+    ("private DELETE", "DELETE", "orders/123456789", {}),
+)
+
+
+def bench(client: Client, method: str, endpoint: str, query: dict, n: int) -> float:
+    prepare = client._prepare_request
+    start = process_time()
+    for _ in range(n):
+        prepare(method, endpoint, query)
+    return (process_time() - start) / n
+
+
+def main(n: int = 100_000):
+    clients = [
+        (name, cls("key", "secret", subaccount="my sub/account"))
+        for name, cls in (("legacy", LegacyClient), ("fast", Client))
+    ]
+    for case, method, endpoint, query in CASES:
+        costs = [bench(client, method, endpoint, query, n) for _, client in clients]
+        print(
+            f"{case:>15}: "
+            + " ".join(
+                f"{name} {cost * 1e6:6.2f}us" for (name, _), cost in zip(clients, costs)
+            )
+            + f"  x{costs[0] / costs[1]:.2f}"
+        )
+    for _, client in clients:
+        client.close()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
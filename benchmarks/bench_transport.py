@@ -0,0 +1,61 @@
+"""
+Compare one-shot `requests.request` calls with the pooled `SessionTransport`.
+The mock server speaks plain HTTP, so the saving shown excludes the TLS handshake
+that a fresh connection to ftx.com would also pay.
+
+    $ python -m benchmarks.bench_transport [requests]
+"""
+import sys
+from time import perf_counter
+
+import requests
+
+from FTX.client import Client
+from FTX.transport import Response, SessionTransport, Transport
+
+from .mock_server import MockServer
+
+
+class OneShotTransport(Transport):
+    """The pre-pooling behaviour: a fresh connection for every request."""
+
+    def request(self, method, url, headers, body=None, timeout=None):
+        response = requests.request(
+            method, url, headers=headers, data=body, timeout=timeout
+        )
+        return Response(response.status_code, response.headers, response.content)
+
+
+def bench(transport: Transport, n: int) -> list:
+    # drive the transport directly so the client's rate limiting stays out of the way
+    client = Client("key", "secret", transport=transport)
+    endpoint, query = "markets/BTC-PERP/orderbook", {"depth": 20}
+    url, headers, _ = client._prepare_request("GET", endpoint, query)
+
+    transport.request("GET", url, headers)  # warm up
+    latencies = []
+    for _ in range(n):
+        start = perf_counter()
+        transport.request("GET", url, headers)
+        latencies.append(perf_counter() - start)
+    client.close()
+    return sorted(latencies)
+
+
+def main(n: int = 500):
+    with MockServer() as server:
+        server.point_constants()
+        for name, transport in (
+            ("one-shot", OneShotTransport()),
+            ("pooled", SessionTransport()),
+        ):
+            latencies = bench(transport, n)
+            print(
+                f"{name:>9}: p50 {latencies[n // 2] * 1e6:8.1f}us "
+                f"p99 {latencies[int(n * .99)] * 1e6:8.1f}us "
+                f"total {sum(latencies):.3f}s for {n} requests"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,331 @@
+"""
+A local stand-in for the FTX REST API used by the benchmarks
+"""
+import json
+import multiprocessing
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from FTX import constants
+
+# the canned history starts here and has a fill every FILL_INTERVAL seconds
+EPOCH = 1_600_000_000
+FILL_INTERVAL = 10
+MARKETS = [f"COIN{i}-PERP" for i in range(200)]
+
+
+def _iso(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def _market(name: str, i: int = 0) -> dict:
+    return {
+        "name": name,
+        "type": "future",
+        "baseCurrency": None,
+        "quoteCurrency": None,
+        "underlying": name.split("-")[0],
+        "enabled": True,
+        "postOnly": False,
+        "restricted": False,
+        "highLeverageFeeExempt": True,
+        "priceIncrement": 0.5,
+        "sizeIncrement": 0.001,
+        "minProvideSize": 0.001,
+        "price": 9000.5 + i,
+        "bid": 9000.0 + i,
+        "ask": 9001.0 + i,
+        "last": 9000.5 + i,
+        "change1h": 0.0012,
+        "change24h": -0.0153,
+        "changeBod": 0.0021,
+        "quoteVolume24h": 123456789.1,
+        "volumeUsd24h": 123456789.1,
+    }
+
+
+def _order(i: int, market: str = "BTC-PERP", **fields) -> dict:
+    return {
+        "id": 90_000_000 + i,
+        "clientId": None,
+        "market": market,
+        "future": market,
+        "type": "limit",
+        "side": "buy" if i % 2 else "sell",
+        "price": 9000.0 + i,
+        "size": 0.01,
+        "status": "open",
+        "filledSize": 0.0,
+        "remainingSize": 0.01,
+        "avgFillPrice": None,
+        "reduceOnly": False,
+        "ioc": False,
+        "postOnly": True,
+        "liquidation": False,
+        "createdAt": _iso(EPOCH + i),
+        **fields,
+    }
+
+
+def _fill(i: int) -> dict:
+    time = EPOCH + i * FILL_INTERVAL
+    return {
+        "id": 10_000_000 + i,
+        "market": "BTC-PERP",
+        "future": "BTC-PERP",
+        "baseCurrency": None,
+        "quoteCurrency": None,
+        "type": "order",
+        "side": "buy" if i % 2 else "sell",
+        "price": 9000.0 + i % 100,
+        "size": 0.01,
+        "orderId": 90_000_000 + i,
+        "tradeId": 70_000_000 + i,
+        "time": _iso(time),
+        "fee": 0.0063,
+        "feeRate": 0.0007,
+        "feeCurrency": "USD",
+        "liquidity": "taker",
+    }
+
+
+def _candle(time: int, resolution: int) -> dict:
+    price = 9000.0 + time // resolution % 100
+    return {
+        "startTime": _iso(time),
+        "time": time * 1_000.0,
+        "open": price,
+        "high": price + 5,
+        "low": price - 5,
+        "close": price + 1,
+        "volume": 12345.6,
+    }
+
+
+def _position(i: int) -> dict:
+    return {
+        "future": MARKETS[i],
+        "side": "buy",
+        "size": 1.0,
+        "netSize": 1.0,
+        "longOrderSize": 0.0,
+        "shortOrderSize": 0.0,
+        "openSize": 1.0,
+        "cost": 9000.0,
+        "entryPrice": 9000.0,
+        "estimatedLiquidationPrice": 4500.0,
+        "unrealizedPnl": 0.0,
+        "realizedPnl": 12.5,
+        "collateralUsed": 900.0,
+        "initialMarginRequirement": 0.1,
+        "maintenanceMarginRequirement": 0.03,
+    }
+
+
+def _balance(coin: str) -> dict:
+    return {
+        "coin": coin,
+        "free": 1000.0,
+        "total": 1000.0,
+        "usdValue": 1000.0,
+        "spotBorrow": 0.0,
+        "availableWithoutBorrow": 1000.0,
+    }
+
+
+def _encode(result) -> bytes:
+    return json.dumps({"success": True, "result": result}).encode("utf-8")
+
+
+# encoded once, so that the server spends its time on the network and not in json
+_STATIC = {
+    "markets": _encode([_market(name, i) for i, name in enumerate(MARKETS)]),
+    "orders": _encode([_order(i) for i in range(20)]),
+    "positions": _encode([_position(i) for i in range(10)]),
+    "wallet/balances": _encode(
+        [_balance(coin) for coin in ("USD", "BTC", "ETH", "FTT")]
+    ),
+    "account": _encode({"username": "bench", "collateral": 10000.0, "leverage": 10}),
+}
+_ORDERBOOK = {
+    depth: _encode(
+        {
+            "bids": [[9000.0 - level * 0.5, 1.0 + level] for level in range(depth)],
+            "asks": [[9000.5 + level * 0.5, 1.0 + level] for level in range(depth)],
+        }
+    )
+    for depth in range(20, 101)
+}
+_TRADES = _encode(
+    [
+        {
+            "id": 50_000_000 + i,
+            "price": 9000.0 + i % 10,
+            "size": 0.01,
+            "side": "buy",
+            "liquidation": False,
+            "time": _iso(EPOCH + i),
+        }
+        for i in range(100)
+    ]
+)
+_EMPTY = _encode({})
+
+
+def _candles(query: dict) -> bytes:
+    resolution = int(query.get("resolution", constants.DEFAULT_K_LINE_RESOLUTION))
+    limit = int(query.get("limit", constants.MAX_K_LINE_LIMIT))
+    end = int(float(query.get("end_time", EPOCH + resolution * limit)))
+    start = int(float(query.get("start_time", end - resolution * (limit - 1))))
+    # the latest `limit` candles of the window, oldest first
+    last = end - end % resolution
+    first = max(start + -start % resolution, last - resolution * (limit - 1))
+    return _encode(
+        [_candle(time, resolution) for time in range(first, last + 1, resolution)]
+    )
+
+
+def _fills(query: dict) -> bytes:
+    # the newest `limit` fills of the window, newest first, like FTX
+    limit = int(query.get("limit", constants.DEFAULT_PAGE_LIMIT))
+    end = float(query.get("end_time", EPOCH + FILL_INTERVAL * 100_000))
+    start = float(query.get("start_time", EPOCH))
+    newest = int((end - EPOCH) // FILL_INTERVAL)
+    oldest = max(0, int(-(-(start - EPOCH) // FILL_INTERVAL)))
+    return _encode(
+        [_fill(i) for i in range(newest, max(oldest, newest - limit + 1) - 1, -1)]
+    )
+
+
+def _route(method: str, endpoint: str, query: dict, body: bytes) -> bytes:
+    parts = endpoint.split("/")
+    if method == "GET":
+        if endpoint in _STATIC:
+            return _STATIC[endpoint]
+        if parts[0] == "markets" and len(parts) == 2:
+            return _encode(_market(parts[1]))
+        if parts[0] == "markets" and len(parts) == 3:
+            if parts[2] == "orderbook":
+                return _ORDERBOOK[int(query.get("depth", 20))]
+            if parts[2] == "trades":
+                return _TRADES
+            if parts[2] == "candles":
+                return _candles(query)
+        if endpoint == "fills":
+            return _fills(query)
+    elif parts[0] == "orders":
+        if method == "DELETE":
+            return _encode("Order queued for cancellation")
+        fields = json.loads(body) if body else {}
+        fields.pop("type", None)
+        return _encode(_order(0, status="new", **fields))
+    return _EMPTY
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so that clients can keep the connection alive
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+        endpoint = url.path.partition("/api/")[2]
+        payload = _route(self.command, endpoint, dict(parse_qsl(url.query)), body)
+        if self.server.latency:
+            sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def _create(host: str, port: int, latency: float) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    httpd.latency = latency
+    return httpd
+
+
+def _serve(connection, host: str, port: int, latency: float):
+    httpd = _create(host, port, latency)
+    connection.send(httpd.server_address[:2])
+    httpd.serve_forever()
+
+
+class MockServer:
+    """
+    Serve canned FTX responses for markets, order books, trades, candles,
+    fills, orders, positions and balances.
+
+        with MockServer(latency=.005) as server:
+            server.point_constants()
+            Client("key", "secret").get_markets()
+
+    :param latency: the seconds to wait before every response
+    :param subprocess: serve from a child process, so that the CPU time of
+      the benchmarking process is spent by the client alone
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        subprocess: bool = False,
+    ):
+        self._host, self._port, self._latency = host, port, latency
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._process: Optional[multiprocessing.Process] = None
+        if not subprocess:
+            self._httpd = _create(host, port, latency)
+            self._address = self._httpd.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self._address
+        return f"http://{host}:{port}/api"
+
+    def point_constants(self):
+        """Route every `Client` request of this process to the server."""
+        constants.PUBLIC_API_URL = constants.PRIVATE_API_URL = self.url
+
+    def start(self):
+        if self._httpd is not None:
+            threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+            return self
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(sender, self._host, self._port, self._latency),
+            daemon=True,
+        )
+        self._process.start()
+        self._address = receiver.recv()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        else:
+            self._process.terminate()
+            self._process.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
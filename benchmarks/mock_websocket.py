@@ -0,0 +1,276 @@
+"""
+A local stand-in for the FTX websocket API, to run `WebsocketClient` against.
+Requires the optional `aiohttp` package.
+
+    $ python -m benchmarks.mock_websocket [--updates 1000] [--bad-checksum-at 10]
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import zlib
+from itertools import zip_longest
+from time import perf_counter
+from typing import Dict, List, Optional
+
+
+def checksum(bids: Dict[float, float], asks: Dict[float, float]) -> int:
+    """
+    :return: the CRC32 of the best 100 levels of each side, interleaved
+      bid, ask, bid... the way FTX computes it
+    """
+    best_bids = sorted(bids.items(), reverse=True)[:100]
+    best_asks = sorted(asks.items())[:100]
+    parts = []
+    for bid, ask in zip_longest(best_bids, best_asks):
+        for level in (bid, ask):
+            if level is not None:
+                parts.append(f"{level[0]}:{level[1]}")
+    return zlib.crc32(":".join(parts).encode("utf-8"))
+
+
+class _Book:
+    """A random walk of price levels around 9000."""
+
+    def __init__(self, seed: int, depth: int = 150):
+        self._random = random.Random(seed)
+        self.bids = {9000.0 - i * 0.5: self._size() for i in range(depth)}
+        self.asks = {9000.5 + i * 0.5: self._size() for i in range(depth)}
+
+    def _size(self) -> float:
+        return round(self._random.uniform(0.001, 20), 4)
+
+    def partial(self) -> dict:
+        return {
+            "action": "partial",
+            "bids": [[price, size] for price, size in sorted(self.bids.items())[::-1]],
+            "asks": [[price, size] for price, size in sorted(self.asks.items())],
+            "checksum": checksum(self.bids, self.asks),
+        }
+
+    def update(self) -> dict:
+        changes = {"bids": [], "asks": []}
+        for _ in range(self._random.randint(1, 4)):
+            side = self._random.choice(("bids", "asks"))
+            levels = self.bids if side == "bids" else self.asks
+            best = max(self.bids) if side == "bids" else min(self.asks)
+            step = -0.5 if side == "bids" else 0.5
+            price = best + step * self._random.randint(0, 120)
+            if price in levels and self._random.random() < 0.3:
+                size = 0.0
+                del levels[price]
+            else:
+                size = levels[price] = self._size()
+            changes[side].append([price, size])
+        return {
+            "action": "update",
+            **changes,
+            "checksum": checksum(self.bids, self.asks),
+        }
+
+
+class MockWebsocketServer:
+    """
+    Serve the orderbook and trades channels of the FTX websocket protocol.
+    Subscribing to a market's order book sends a partial followed by
+    `updates` updates carrying the real checksum of the book; unsubscribing
+    and subscribing again sends a fresh partial, which is how
+    `WebsocketClient` resyncs without a REST client.
+
+        with MockWebsocketServer(updates=100, bad_checksum_at=10) as server:
+            ws = WebsocketClient(url=server.url)
+            await ws.subscribe("orderbook", "BTC-PERP")
+            await ws.run()  # returns once the server closes the connection
+
+    :param updates: the updates sent after every partial
+    :param interval: the seconds between two updates
+    :param bad_checksum_at: the index of the update of the first subscription
+      to every market which is sent with a wrong checksum, None for none
+    :param close_when_done: close the connection once every subscribed book
+      has been sent all its updates
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        updates: int = 100,
+        interval: float = 0.001,
+        bad_checksum_at: Optional[int] = None,
+        close_when_done: bool = True,
+    ):
+        self._host, self._port = host, port
+        self._updates = updates
+        self._interval = interval
+        self._bad_checksum_at = bad_checksum_at
+        self._close_when_done = close_when_done
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner = None
+        # every message received from clients, in order
+        self.received: List[dict] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._host}:{self._port}/ws/"
+
+    async def _stream(self, ws, market: str, corrupt: bool):
+        book = _Book(seed=zlib.crc32(market.encode("utf-8")))
+        await ws.send_str(
+            json.dumps(
+                {
+                    "channel": "orderbook",
+                    "market": market,
+                    "type": "partial",
+                    "data": book.partial(),
+                }
+            )
+        )
+        for i in range(self._updates):
+            await asyncio.sleep(self._interval)
+            data = book.update()
+            if corrupt and i == self._bad_checksum_at:
+                data["checksum"] ^= 0xFFFF
+            await ws.send_str(
+                json.dumps(
+                    {
+                        "channel": "orderbook",
+                        "market": market,
+                        "type": "update",
+                        "data": data,
+                    }
+                )
+            )
+
+    async def _handle(self, request):
+        from aiohttp import WSMsgType, web
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        streams: Dict[str, asyncio.Task] = {}
+        corrupted = set()
+
+        def finished(task):
+            if (
+                self._close_when_done
+                and not task.cancelled()
+                and all(stream.done() for stream in streams.values())
+            ):
+                asyncio.ensure_future(ws.close())
+
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                break
+            payload = json.loads(message.data)
+            self.received.append(payload)
+            op, channel = payload.get("op"), payload.get("channel")
+            market = payload.get("market")
+
+            if op == "ping":
+                await ws.send_str(json.dumps({"type": "pong"}))
+            elif op == "subscribe":
+                await ws.send_str(
+                    json.dumps(
+                        {"type": "subscribed", "channel": channel, "market": market}
+                    )
+                )
+                if channel == "orderbook":
+                    corrupt = (
+                        self._bad_checksum_at is not None and market not in corrupted
+                    )
+                    corrupted.add(market)
+                    streams[market] = asyncio.ensure_future(
+                        self._stream(ws, market, corrupt)
+                    )
+                    streams[market].add_done_callback(finished)
+                elif channel == "trades":
+                    trade = {"id": 1, "price": 9000.5, "size": 0.01, "side": "buy"}
+                    await ws.send_str(
+                        json.dumps(
+                            {
+                                "channel": channel,
+                                "market": market,
+                                "type": "update",
+                                "data": [trade],
+                            }
+                        )
+                    )
+            elif op == "unsubscribe":
+                stream = streams.pop(market, None)
+                if stream is not None:
+                    stream.cancel()
+                await ws.send_str(
+                    json.dumps(
+                        {"type": "unsubscribed", "channel": channel, "market": market}
+                    )
+                )
+
+        for stream in streams.values():
+            stream.cancel()
+        return ws
+
+    async def _serve(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/ws/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        self._port = self._runner.addresses[0][1]
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._serve(), self._loop).result()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+async def _run(url: str, markets: List[str]) -> dict:
+    from FTX.websocket import WebsocketClient
+
+    ws = WebsocketClient(url=url)
+    books = []
+    ws.on("orderbook", lambda market, book: books.append(market))
+    for market in markets:
+        await ws.subscribe("orderbook", market)
+    start = perf_counter()
+    await ws.run()
+    elapsed = perf_counter() - start
+    return {"books": len(books), "resyncs": dict(ws.resyncs), "elapsed": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--updates", type=int, default=1_000)
+    parser.add_argument("--markets", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=0.0005)
+    parser.add_argument("--bad-checksum-at", type=int, default=None)
+    args = parser.parse_args()
+
+    markets = [f"COIN{i}-PERP" for i in range(args.markets)]
+    with MockWebsocketServer(
+        updates=args.updates,
+        interval=args.interval,
+        bad_checksum_at=args.bad_checksum_at,
+    ) as server:
+        result = asyncio.run(_run(server.url, markets))
+    print(
+        f"{result['books']} books published in {result['elapsed']:.3f}s, "
+        f"resyncs {result['resyncs'] or 'none'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
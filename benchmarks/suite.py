@@ -0,0 +1,136 @@
+"""
+Drive `Client` through realistic workloads against the local mock server and
+report the request latency, throughput and client CPU time per request.
+
+    $ python -m benchmarks.suite [--latency 0.002] [--requests 600] [--json]
+
+The mock server runs in a child process, so the CPU time reported is spent by
+the client alone, and the client is given a rate limiter loose enough not to
+throttle the run.
+"""
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, process_time
+from typing import Callable, Dict, List
+
+from FTX.backfill import Backfill
+from FTX.client import Client
+from FTX.metrics import Metrics
+from FTX.ratelimit import RateLimiter
+
+from .mock_server import EPOCH, FILL_INTERVAL, MARKETS, MockServer
+
+
+def quote_loop(client: Client, requests: int):
+    """Read the book, requote and cancel, three requests per round."""
+    for i in range(requests // 3):
+        book = client.get_orderbook("BTC-PERP", 20)
+        price = book["bids"][0][0] - i % 5 * 0.5
+        order = client.create_order(
+            "BTC-PERP", "buy", price, "limit", 0.01, postOnly=True
+        )
+        client.cancel_order(order["id"])
+
+
+def history_backfill(client: Client, requests: int):
+    """Download one-minute candles of four markets, a request per 1500 candles."""
+    markets = MARKETS[:4]
+    chunks = max(1, requests // len(markets))
+    end = EPOCH + 60 * 1_500 * chunks - 60
+    Backfill(client, resolution=60, max_workers=4).run(markets, EPOCH, end)
+
+
+def portfolio_refresh(client: Client, requests: int):
+    """Refresh balances, positions, open orders and recent fills concurrently."""
+    calls = (
+        client.get_balances,
+        client.get_positions,
+        client.get_open_orders,
+        lambda: client.get_fills(
+            "BTC-PERP", start_time=EPOCH, end_time=EPOCH + FILL_INTERVAL * 1_000
+        ),
+    )
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        for _ in range(requests // len(calls)):
+            for future in [executor.submit(call) for call in calls]:
+                future.result()
+
+
+WORKLOADS: Dict[str, Callable[[Client, int], None]] = {
+    "quote_loop": quote_loop,
+    "history_backfill": history_backfill,
+    "portfolio_refresh": portfolio_refresh,
+}
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def run(workload: Callable[[Client, int], None], requests: int) -> dict:
+    latencies = []
+    metrics = Metrics()
+    metrics.on_request(
+        lambda sample: latencies.append(
+            sample.wait + sample.sign + sample.network + sample.decode
+        )
+    )
+    with Client(
+        "key", "secret", rate_limiter=RateLimiter(rate=1e9), metrics=metrics
+    ) as client:
+        workload(client, 3)  # warm up the connections
+        latencies.clear()
+
+        start, cpu = perf_counter(), process_time()
+        workload(client, requests)
+        elapsed, cpu = perf_counter() - start, process_time() - cpu
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1e3,
+        "p99_ms": _percentile(latencies, 99) * 1e3,
+        "cpu_us_per_request": cpu / len(latencies) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="server latency in seconds"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=600, help="requests per workload"
+    )
+    parser.add_argument(
+        "--workload", action="append", choices=list(WORKLOADS), help="run only these"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with MockServer(latency=args.latency, subprocess=True) as server:
+        server.point_constants()
+        for name in args.workload or WORKLOADS:
+            results[name] = run(WORKLOADS[name], args.requests)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'workload':<18} {'requests':>8} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'CPU us/req':>10}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<18} {result['requests']:>8} "
+            f"{result['requests_per_second']:>9.1f} {result['p50_ms']:>8.3f} "
+            f"{result['p99_ms']:>8.3f} {result['cpu_us_per_request']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,4 +7,6 @@ setup(name='ftx-api-wrapper-python3',
       author='Brendan C. Lee',
       license='MIT License',
       packages=['FTX'],
+      extras_require={'async': ['aiohttp'], 'numpy': ['numpy'],
+                      'fast': ['orjson']},
       )